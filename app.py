@@ -1,7 +1,10 @@
 import streamlit as st
 import os
-import requests
-import xml.etree.ElementTree as ET
+
+from utils import metrics
+from utils.diagnostics import profile_rerun
+from utils.hot_games import get_hot_games_snapshot, get_refresher
+from utils.image_cache import get_image_cache
 
 if 'API_URI' in os.environ:
     BASE_URI = st.secrets[os.environ.get('API_URI')]
@@ -12,33 +15,33 @@ BASE_URI = BASE_URI if BASE_URI.endswith('/') else BASE_URI + '/'
 # Define the url to be used by requests.get to get a prediction (adapt if needed)
 url = BASE_URI + 'predict'
 
-# Function to fetch top 10 board games from BGG
+HOT_GAMES_POLL_SECONDS = 5  # while the banner waits for its first snapshot
+
+# Function to get top 10 board games from BGG
+@metrics.timed("function_seconds", function="get_bgg_top_games")
 def get_bgg_top_games(limit=10):
     """
-    Fetches the top N hot games on BoardGameGeek.
+    Returns the top N hot games on BoardGameGeek from the current snapshot,
+    without ever waiting on the network (see utils.hot_games).
+    Images are served from the local image cache once downloaded.
     Returns a list of tuples: (title, image_url)
     """
-    url = "https://boardgamegeek.com/xmlapi2/hot?type=boardgame"
-    games = []
-
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
-            for item in root.findall("item")[:limit]:
-                game_id = item.attrib["id"]
-                # Fetch game details
-                details_url = f"https://boardgamegeek.com/xmlapi2/thing?id={game_id}"
-                details_resp = requests.get(details_url)
-                if details_resp.status_code == 200:
-                    details_root = ET.fromstring(details_resp.content)
-                    image_url = details_root.find("item/image").text
-                    title = details_root.find("item/name").attrib["value"]
-                    games.append((title, image_url))
-    except Exception as e:
-        st.error(f"Failed to fetch game data: {e}")
-
-    return games
+    image_cache = get_image_cache()
+    return [(title, image_cache.data_uri(image_url, "banner"))
+            for title, image_url in get_hot_games_snapshot().games[:limit]]
+
+@st.fragment(run_every=HOT_GAMES_POLL_SECONDS)
+def wait_for_hot_games():
+    """
+    Shown while there is no hot games snapshot yet: polls it, then reruns
+    the page once the background refresh has it, to show the banner.
+    """
+    if get_hot_games_snapshot().games:
+        st.rerun()
+    if get_refresher().last_error:
+        st.info("Could not load games from BoardGameGeek yet, trying again shortly.")
+    else:
+        st.info("Loading games from BoardGameGeek, they will show up in a moment.")
 
 # Function to generate the auto-scrolling banner with pause on hover
 def generate_horizontal_scroller(games, height=250, speed=30):
@@ -169,12 +172,13 @@ def show_home():
     st.markdown("---")
     st.markdown("## 📢 Top 10 board games from BGG")
 
-    games = get_bgg_top_games(limit=10)
-    if games:
-        scroller_html = generate_horizontal_scroller(games, height=220, speed=70)
-        st.components.v1.html(scroller_html, height=310)
-    else:
-        st.info("Could not load games from BoardGameGeek.")
+    with metrics.timer("page_render_seconds", page="home", phase="banner"):
+        games = get_bgg_top_games(limit=10)
+        if games:
+            scroller_html = generate_horizontal_scroller(games, height=220, speed=70)
+            st.components.v1.html(scroller_html, height=310)
+        else:
+            wait_for_hot_games()
 
     # Objective Section
     st.markdown("---")
@@ -227,4 +231,5 @@ def show_home():
 
 # Enable running directly
 # if __name__ == "__main__":
-show_home()
+with profile_rerun("home"), metrics.timer("page_render_seconds", page="home", phase="total"):
+    show_home()
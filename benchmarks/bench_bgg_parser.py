@@ -0,0 +1,112 @@
+"""
+Micro-benchmark of the BGG game parser against the former xmltodict path.
+
+Uses the boardgame fixture in benchmarks/fixtures (legacy xmlapi format,
+stats=1), alone and repeated as a 20-game batch response.
+
+    python -m benchmarks.bench_bgg_parser
+"""
+import os
+import re
+import timeit
+
+from utils.bgg_parser import parse_boardgames
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+BATCH_SIZE = 20
+
+
+def legacy_parse(content):
+    '''
+    The xmltodict based parsing that game_info used before utils.bgg_parser,
+    kept verbatim as the benchmark baseline.
+    '''
+    import xmltodict
+
+    list_column = ['@objectid','yearpublished',
+                'minplayers', 'maxplayers',
+                'playingtime','minplaytime',
+                'maxplaytime', 'age', 'name',
+                'description', 'thumbnail', 'image',
+                'boardgamepublisher','boardgamedesigner', 'boardgameartist',
+                'boardgamehonor', 'boardgamecategory',
+                'boardgamefamily', 'boardgamemechanic','boardgamesubdomain',
+                'statistics'
+                ]
+    data_dict = xmltodict.parse(content)
+
+    games = data_dict.get('boardgames', {}).get('boardgame', [])
+    if not isinstance(games, list):
+        games = [games]  # Ensure it's always a list
+
+    result = []
+    for game in games:
+        entry = {}
+        for key in list_column:
+            value = game.get(key, '')
+            if isinstance(value, dict):
+                if key == 'statistics':
+                    entry['average'] = value.get('ratings','').get('average','')
+                    entry['averageweight'] = value.get('ratings','').get('averageweight','')
+                else:
+                    entry[key] = value.get('#text', '')
+                if key == 'name':
+                    if value.get('@primary', ''):
+                        entry['main_name'] = value.get('#text', '')
+            elif isinstance(value, list):
+                if key == 'name':
+                    for v in value:
+                        if v.get('@primary', ''):
+                            entry['main_name'] = v.get('#text', '')
+                entry[key] = [v.get('#text', '') for v in value]
+            else:
+                entry[key] = value or ''
+        result.append(entry)
+    return result
+
+
+def load_fixture(name="boardgame_224517.xml"):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+def make_batch(content, size=BATCH_SIZE):
+    """Repeats the fixture's <boardgame> element, as a multi-ID response would."""
+    text = content.decode("utf-8")
+    game = re.search(r"<boardgame objectid=.*?</boardgame>", text, re.S).group(0)
+    games = [game.replace('objectid="224517"', f'objectid="{224517 + i}"', 1) for i in range(size)]
+    return text.replace(game, "\n".join(games)).encode("utf-8")
+
+def check_same_output(content):
+    """The new parser must show the same data as the old one."""
+    old, new = legacy_parse(content)[0], parse_boardgames(content)[0]
+    for key in ('@objectid', 'main_name', 'description', 'image', 'name', 'boardgamecategory',
+                'boardgamemechanic', 'boardgamefamily', 'boardgamehonor'):
+        assert old[key] == new[key], key
+    for key in ('yearpublished', 'minplayers', 'maxplayers', 'playingtime', 'age', 'average', 'averageweight'):
+        assert float(old[key]) == float(new[key]), key
+
+def bench(func, content, number=200, repeat=5):
+    """Returns the best time per call, in milliseconds."""
+    return min(timeit.repeat(lambda: func(content), number=number, repeat=repeat)) / number * 1000
+
+def run():
+    single = load_fixture()
+    batch = make_batch(single)
+    results = {}
+    for label, content, number in [("single game", single, 200), (f"{BATCH_SIZE} games batch", batch, 20)]:
+        try:
+            results[label] = {"xmltodict_ms": bench(legacy_parse, content, number)}
+            check_same_output(content)
+        except ImportError:
+            results[label] = {"xmltodict_ms": None}
+        results[label]["iterparse_ms"] = bench(parse_boardgames, content, number)
+    return results
+
+
+if __name__ == "__main__":
+    for label, result in run().items():
+        old, new = result["xmltodict_ms"], result["iterparse_ms"]
+        if old is None:
+            print(f"{label:>16}: iterparse {new:.3f} ms (xmltodict not installed)")
+        else:
+            print(f"{label:>16}: xmltodict {old:.3f} ms, iterparse {new:.3f} ms, x{old / new:.1f}")
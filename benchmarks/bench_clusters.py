@@ -0,0 +1,75 @@
+"""
+Throughput of the nearest-cluster assignment and of the cluster index.
+
+- assign: utils.clusters.assign_clusters on generated catalogs, against a
+  per-game Python loop over CLUSTER_CENTERS (timed on the first 100k games)
+- index: building the ClusterIndex, then getting the games of one cluster
+  as a slice of the index against a boolean mask over the whole catalog
+
+    python -m benchmarks.bench_clusters
+"""
+import math
+import time
+
+import numpy as np
+
+from constant.params import CLUSTER_CENTERS, CLUSTER_IDS
+from utils.clusters import CENTERS, SCALE, ClusterIndex, assign_clusters
+
+CATALOG_SIZES = [100_000, 1_000_000, 10_000_000]
+LOOP_SIZE = 100_000
+HIDDEN_TREASURES = CLUSTER_IDS["Hidden Treasures → Niche games underappreciated"]
+
+
+def generated_games(size, seed=0):
+    """(average, usersrated) drawn around the cluster centers."""
+    rng = np.random.default_rng(seed)
+    centers = np.array(CLUSTER_CENTERS)[rng.integers(0, len(CLUSTER_CENTERS), size)]
+    average = np.clip(centers[:, 0] + rng.normal(0, 0.8, size), 0, 10).astype(np.float32)
+    usersrated = np.maximum(centers[:, 1] * rng.lognormal(0, 0.5, size), 0).round().astype(np.float32)
+    return average, usersrated
+
+def loop_assign(average, usersrated):
+    """The same assignment, one game at a time."""
+    centers = [tuple(center / SCALE) for center in CENTERS]
+    clusters = []
+    for avg, rated in zip(average.tolist(), usersrated.tolist()):
+        point = (avg / SCALE[0], math.log1p(max(rated, 0)) / SCALE[1])
+        clusters.append(min(range(len(centers)), key=lambda c: (point[0] - centers[c][0]) ** 2 + (point[1] - centers[c][1]) ** 2))
+    return clusters
+
+def best_of(func, repeat=3):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        durations.append(time.perf_counter() - start)
+    return min(durations), value
+
+def run(sizes=CATALOG_SIZES):
+    results = {}
+    for size in sizes:
+        average, usersrated = generated_games(size)
+        assign, clusters = best_of(lambda: assign_clusters(average, usersrated))
+        loop, loop_clusters = best_of(lambda: loop_assign(average[:LOOP_SIZE], usersrated[:LOOP_SIZE]), repeat=1)
+        assert (np.array(loop_clusters) == clusters[:LOOP_SIZE]).all()
+        build, index = best_of(lambda: ClusterIndex(clusters))
+        sliced, rows = best_of(lambda: index.rows(HIDDEN_TREASURES), repeat=100)
+        masked, mask_rows = best_of(lambda: np.flatnonzero(clusters == HIDDEN_TREASURES), repeat=10)
+        assert (rows == mask_rows).all()
+        results[size] = {
+            "assign_games_per_s": size / assign,
+            "loop_games_per_s": LOOP_SIZE / loop,
+            "index_build_ms": build * 1000,
+            "slice_us": sliced * 1e6,
+            "mask_us": masked * 1e6,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for size, result in run().items():
+        print(f"{size:>10} games: assign {result['assign_games_per_s'] / 1e6:6.1f} M games/s "
+              f"(loop {result['loop_games_per_s'] / 1e6:.2f} M games/s), "
+              f"index built in {result['index_build_ms']:.0f} ms, "
+              f"Hidden Treasures {result['slice_us']:.1f} us as a slice, {result['mask_us']:.0f} us as a mask")
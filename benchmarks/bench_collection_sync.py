@@ -0,0 +1,66 @@
+"""
+"Based on my BGG" searches with and without the synced collection, offline.
+
+The local stub plays BGG (one 202 "queued" answer per user, then the
+collection) and the backend, whose predict_userID takes `collection_pull`
+extra seconds when it has to pull the collection from BGG itself, as it
+does without collection_owned.
+
+- full sync, then incremental sync (modifiedsince) of one collection
+- a search of a user whose collection is not synced: the backend pulls it
+- a search with the synced collection, then the same search again: the
+  collection_token keeps it cached for COLLECTION_TOKEN_TTL instead of the
+  predict_userID TTL
+
+    python -m benchmarks.bench_collection_sync
+"""
+import tempfile
+import time
+
+from benchmarks.stub_server import StubConfig, start_stub_server
+from benchmarks.suite import setup_environment
+
+COLLECTION_PULL = 2.0  # seconds
+PREDICT_LATENCY = 0.3  # seconds
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return (time.perf_counter() - start) * 1000, value
+
+def run(collection_games=500):
+    config = StubConfig(latency=PREDICT_LATENCY, collection_games=collection_games, collection_pull=COLLECTION_PULL)
+    server, base_url = start_stub_server(config)
+    setup_environment(tempfile.mkdtemp(prefix="wwpbg-collection-"), base_url)
+    from pages.predictGames import make_api_call
+    from utils.collection_sync import collection_params, get_collection_sync
+    from utils.predict_cache import get_predict_cache
+
+    base_uri = f"{base_url}/"
+    params = {"userID": "benchmark", "predict_option": "Both"}
+    try:
+        collection_sync = get_collection_sync()
+        results = {}
+        results["full_sync_ms"], collection = timed(lambda: collection_sync.sync("benchmark"))
+        results["incremental_sync_ms"], _ = timed(lambda: collection_sync.sync("benchmark"))
+        results["collection_games"] = len(collection["items"])
+
+        get_predict_cache().clear()
+        results["search_backend_pulls_ms"], _ = timed(lambda: make_api_call("predict_userID", params, base_uri=base_uri))
+        synced = dict(params, **collection_params("benchmark", mode="local"))
+        results["search_synced_ms"], _ = timed(lambda: make_api_call("predict_userID", synced, base_uri=base_uri))
+        results["search_synced_repeat_ms"], _ = timed(lambda: make_api_call("predict_userID", synced, base_uri=base_uri))
+        results["queued_by_bgg"] = sum(server.RequestHandlerClass.queued.values())
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"collection of {results['collection_games']} games: full sync {results['full_sync_ms']:.0f} ms "
+          f"(after {results['queued_by_bgg']} 'queued' answer), incremental sync {results['incremental_sync_ms']:.0f} ms")
+    print(f"search, backend pulls the collection: {results['search_backend_pulls_ms']:.0f} ms")
+    print(f"search with the synced collection: {results['search_synced_ms']:.0f} ms, "
+          f"repeated: {results['search_synced_repeat_ms']:.1f} ms")
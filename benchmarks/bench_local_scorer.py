@@ -0,0 +1,95 @@
+"""
+Latency of the local predict_filters scorer against catalog size.
+
+Catalogs are generated: features drawn around the four cluster centers,
+2 to 4 categories, 2 to 6 mechanics and 0 to 6 families per game, codes
+taken from the taxonomy index. Each query is a random "Game for a friend"
+request, with taxonomy selections one time out of two.
+
+    python -m benchmarks.bench_local_scorer
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from constant.params import AGE, CLUSTER_CENTERS, CLUSTER_MAP, PLAYING_TIME, YEAR_PUBLISHED
+from pages.predictGames import filter_params
+from utils.filter_encoding import FILTER_FIELDS
+from utils.local_catalog import FEATURES, TEXT_COLUMNS, GameCatalog
+from utils.taxonomy import load_taxonomy_index
+
+CATALOG_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUERIES = 50
+TAXONOMY_COUNTS = {  # request parameter: (min, max) labels per game
+    "boardgamecategory": (2, 4),
+    "boardgamemechanic": (2, 6),
+    "boardgamefamily": (0, 6),
+}
+
+
+def synthetic_catalog(size, seed=0):
+    """DataFrame in the catalog format, with `size` generated games."""
+    rng = np.random.default_rng(seed)
+    taxonomy = load_taxonomy_index()
+    centers = np.array(CLUSTER_CENTERS)[rng.integers(0, len(CLUSTER_CENTERS), size)]
+    frame = pd.DataFrame({
+        "objectid": np.arange(size, dtype=np.int64) + 1,
+        "average": np.clip(centers[:, 0] + rng.normal(0, 0.8, size), 0, 10),
+        "usersrated": np.maximum(centers[:, 1] * rng.lognormal(0, 0.5, size), 0).round(),
+        "playingtime": rng.choice([15, 30, 45, 60, 90, 120, 180], size),
+        "minplayers": rng.integers(1, 5, size),
+        "age": rng.choice([6, 8, 10, 12, 14, 16, 18], size),
+        "yearpublished": rng.integers(1950, 2025, size),
+    }).astype({name: "float32" for name in FEATURES})
+    for column in TEXT_COLUMNS:
+        frame[column] = ""
+    for field, vocabulary in FILTER_FIELDS.items():
+        codes = np.array(taxonomy[vocabulary].codes, np.int32)
+        low, high = TAXONOMY_COUNTS[field]
+        frame[field] = [rng.choice(codes, count, replace=False) for count in rng.integers(low, high + 1, size)]
+    return frame
+
+def random_request(rng, taxonomy):
+    details = {
+        "cluster": rng.choice(list(CLUSTER_MAP.values())),
+        "playingtime": rng.choice(list(PLAYING_TIME)),
+        "minplayers": int(rng.integers(1, 5)),
+        "age": rng.choice(list(AGE)),
+        "yearpublished": rng.choice(list(YEAR_PUBLISHED)),
+    }
+    for field, vocabulary in FILTER_FIELDS.items():
+        labels = taxonomy[vocabulary].labels
+        details[field] = [str(label) for label in rng.choice(labels, rng.integers(1, 3))] if rng.random() < 0.5 else []
+    return filter_params(details)
+
+def run(sizes=CATALOG_SIZES, queries=QUERIES):
+    rng = np.random.default_rng(1)
+    taxonomy = load_taxonomy_index()
+    requests = [random_request(rng, taxonomy) for _ in range(queries)]
+    results = {}
+    for size in sizes:
+        frame = synthetic_catalog(size)
+        start = time.perf_counter()
+        catalog = GameCatalog(frame)
+        load = time.perf_counter() - start
+        samples = []
+        for params in requests:
+            start = time.perf_counter()
+            catalog.predict(params)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        taxonomy_bytes = sum(rows.nbytes + codes.nbytes for rows, codes in catalog.taxonomy.values())
+        results[size] = {
+            "load_ms": load * 1000,
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "p95_ms": samples[int(0.95 * len(samples))] * 1000,
+            "arrays_mb": (catalog.features.nbytes + catalog.raw.nbytes + taxonomy_bytes) / 2 ** 20,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for size, result in run().items():
+        print(f"{size:>9} games: predict p50 {result['p50_ms']:7.2f} ms, p95 {result['p95_ms']:7.2f} ms, "
+              f"catalog arrays {result['arrays_mb']:6.1f} MB, built in {result['load_ms']:.0f} ms")
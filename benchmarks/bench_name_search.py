@@ -0,0 +1,79 @@
+"""
+Per-keystroke latency of the local game-name search.
+
+Catalogs are generated as in bench_local_scorer, with names of 1 to 4 words
+(some accented) and 0 to 3 alternate names. Each query types the start of a
+random game name one character at a time, each prefix is one search. The
+baseline is a linear scan of the normalized names, as a search without the
+index would do.
+
+    python -m benchmarks.bench_name_search
+"""
+import time
+
+import numpy as np
+
+from benchmarks.bench_local_scorer import synthetic_catalog
+from utils.local_catalog import GameCatalog
+from utils.name_search import NameIndex, normalize
+
+CATALOG_SIZES = [10_000, 100_000]
+QUERIES = 50
+WORDS = ["catan", "ticket", "ride", "aventuriers", "rail", "château", "forêt", "dragon", "empire", "mystère",
+         "pandemic", "legacy", "terraforming", "mars", "wingspan", "azul", "carcassonne", "dominion", "gloom",
+         "haven", "citadelles", "kingdom", "île", "trésor", "space", "galaxy", "zoo", "café", "station", "king"]
+
+
+def named_catalog(size, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = synthetic_catalog(size, seed)
+    def random_name():
+        return " ".join(rng.choice(WORDS, rng.integers(1, 5))).title() + f" {rng.integers(1, 1000)}"
+    frame["name"] = [random_name() for _ in range(size)]
+    frame["alternate_names"] = [[random_name() for _ in range(rng.integers(0, 4))] for _ in range(size)]
+    return GameCatalog(frame)
+
+def linear_search(names, query, limit=10):
+    key = normalize(query)
+    return [name for name in names if key in name][:limit]
+
+def run(sizes=CATALOG_SIZES):
+    rng = np.random.default_rng(1)
+    results = {}
+    for size in sizes:
+        catalog = named_catalog(size)
+        start = time.perf_counter()
+        index = NameIndex(catalog)
+        build = time.perf_counter() - start
+
+        prefixes = []
+        for row in rng.choice(size, QUERIES):
+            name = catalog.text["name"][row]
+            prefixes += [name[:length] for length in range(2, min(len(name), 12) + 1)]
+        samples = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.search(prefix)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+
+        names = [normalize(name) for name in catalog.text["name"]]
+        start = time.perf_counter()
+        for prefix in prefixes[:50]:
+            linear_search(names, prefix)
+        linear = (time.perf_counter() - start) / 50
+        results[size] = {
+            "build_s": build,
+            "keys": len(index),
+            "p50_us": samples[len(samples) // 2] * 1e6,
+            "p99_us": samples[int(0.99 * len(samples))] * 1e6,
+            "linear_us": linear * 1e6,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for size, result in run().items():
+        print(f"{size:>8} games: {result['keys']} keys built in {result['build_s']:.1f} s, "
+              f"search p50 {result['p50_us']:.0f} us, p99 {result['p99_us']:.0f} us "
+              f"(linear scan {result['linear_us']:.0f} us)")
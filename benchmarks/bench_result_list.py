@@ -0,0 +1,108 @@
+"""
+Rerun cost of the predictGames result list, paginated against the former
+render-everything loop.
+
+Each rerun is what a widget interaction costs once results are displayed:
+the page script is run again with `games_list` already in session state.
+With pagination the time follows the page size, not the result count.
+The legacy baseline renders the cards only, without the filter panel.
+
+    python -m benchmarks.bench_result_list
+"""
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from utils.game_results import project_games
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_PATH = os.path.join(ROOT_DIR, "pages", "predictGames.py")
+RESULT_COUNTS = [25, 100, 500]
+PAGE_SIZES = [10, 50]
+
+
+def legacy_list(games):
+    '''
+    The results loop that show_predict_games ran before pagination, kept
+    verbatim (minus the page chrome) as the benchmark baseline.
+    '''
+    import streamlit as st
+
+    for game in games:
+        col_img, col_details, col_button = st.columns([1, 4, 1])
+        with col_img:
+            if game.get('image'):
+                st.image(game['thumbnail'], width=100)
+            else:
+                st.write("No image available.")
+        with col_details:
+            st.markdown(f"**Name:** {game.get('name', 'N/A')}")
+            st.markdown(f"**Age:** {game.get('age', 'Not specified')}")
+            st.markdown(f"**Description:** {game.get('description', 'No description available')[:100]}...")
+
+            bgg_url = f"https://boardgamegeek.com/boardgame/{game.get('@objectid')}"
+
+        with col_button :
+            if st.button('More infos',key = game.get('@objectid')):
+                st.session_state['current_id'] = game.get('@objectid')
+            st.markdown(f" <a href='{bgg_url}' target='_blank'>BGG Info</a>", unsafe_allow_html=True)
+
+
+def make_games(count):
+    return [
+        {
+            "@objectid": str(100000 + i),
+            "name": f"Game {i}",
+            "age": 8 + i % 6,
+            "average": round(5 + (i * 37 % 50) / 10, 1),
+            "thumbnail": f"https://cf.geekdo-images.com/thumb/{i}.jpg",
+            "image": f"https://cf.geekdo-images.com/original/{i}.jpg",
+            "description": "A game description. " * 20,
+        }
+        for i in range(count)
+    ]
+
+def make_page_app(games, page_size):
+    app = AppTest.from_file(PAGE_PATH, default_timeout=120)
+    app.secrets["cloud_api_uri"] = "http://localhost/"
+    app.session_state["type_from_home"] = "Game for a friend"
+    app.session_state["games_list"] = project_games(games)
+    app.session_state["results_page_size"] = page_size
+    return app
+
+def make_legacy_app(games):
+    app = AppTest.from_function(legacy_list, args=(games,), default_timeout=120)
+    return app
+
+def bench(app, repeat=5):
+    """Returns the best rerun time, in milliseconds."""
+    app.run() # First run: imports and caches
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    assert not app.exception, app.exception
+    return min(times) * 1000
+
+def run():
+    cwd = os.getcwd()
+    os.chdir(ROOT_DIR) # The page reads its data files relatively
+    try:
+        results = {}
+        for count in RESULT_COUNTS:
+            games = make_games(count)
+            results[count] = {"legacy_ms": bench(make_legacy_app(games))}
+            for page_size in PAGE_SIZES:
+                results[count][f"page_{page_size}_ms"] = bench(make_page_app(games, page_size))
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    for count, result in run().items():
+        pages = ", ".join(f"{key[:-3].replace('_', ' ')} {value:.0f} ms"
+                          for key, value in result.items() if key.startswith("page_"))
+        print(f"{count:>5} games: legacy loop {result['legacy_ms']:.0f} ms, {pages}")
@@ -0,0 +1,60 @@
+"""
+Memory a session keeps for its `games_list`: the raw predict answer
+against the compact GameResult records stored since.
+
+The predicted games are modelled on the boardgame fixture in
+benchmarks/fixtures: a full BGG record per game, description included. Each
+list is decoded from JSON, as received, so no string is shared between
+games.
+
+    python -m benchmarks.bench_session_memory
+"""
+import gc
+import json
+import tracemalloc
+
+from benchmarks.bench_bgg_parser import load_fixture
+from utils.bgg_parser import parse_boardgames
+from utils.game_results import project_games
+
+RESULT_COUNTS = [25, 100, 500]
+
+
+def make_response(count):
+    """JSON body of a predict answer with `count` games."""
+    game = parse_boardgames(load_fixture())[0]
+    game["name"] = game.pop("main_name")
+    games = []
+    for i in range(count):
+        games.append(dict(game, **{"@objectid": str(100000 + i), "name": f"{game['name']} {i}"}))
+    return json.dumps(games)
+
+def measure(build):
+    """Returns (bytes retained by the object built, the object)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return retained, value
+
+def run():
+    results = {}
+    for count in RESULT_COUNTS:
+        body = make_response(count)
+        raw_bytes, raw = measure(lambda: json.loads(body))
+        del raw
+        # The raw answer is dropped once projected, only the records stay
+        compact_bytes, compact = measure(lambda: project_games(json.loads(body)))
+        assert len(compact) == count
+        results[count] = {"raw_kb": raw_bytes / 1024, "compact_kb": compact_bytes / 1024}
+    return results
+
+
+if __name__ == "__main__":
+    for count, result in run().items():
+        raw, compact = result["raw_kb"], result["compact_kb"]
+        print(f"{count:>5} games: raw dicts {raw:.0f} KiB, GameResult {compact:.0f} KiB, x{raw / compact:.1f} smaller")
@@ -0,0 +1,89 @@
+"""
+Build time, size, lookup latency and recall of the "more like this" index.
+
+Catalogs are generated as in bench_local_scorer, with taxonomy codes drawn
+from themes (small pools of categories, mechanics and families), so that
+games of one theme are alike. Recall is the share of the exact top
+neighbors by Jaccard similarity found by the index, on a sample of games.
+
+    python -m benchmarks.bench_similar_games
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_local_scorer import synthetic_catalog
+from utils.filter_encoding import FILTER_FIELDS
+from utils.local_catalog import GameCatalog
+from utils.similar_games import SimilarGames, build_similarity_index, game_tokens
+from utils.taxonomy import load_taxonomy_index
+
+CATALOG_SIZES = [10_000, 100_000]
+THEMES = 2000
+THEME_POOL = 8  # codes per vocabulary and theme
+LOOKUPS = 1000
+RECALL_SAMPLE = 50
+
+
+def themed_frame(size, seed=0):
+    """Catalog DataFrame, games of one theme share most of their taxonomy codes."""
+    rng = np.random.default_rng(seed)
+    frame = synthetic_catalog(size, seed)
+    taxonomy = load_taxonomy_index()
+    themes = rng.integers(0, THEMES, size)
+    for field, vocabulary in FILTER_FIELDS.items():
+        codes = np.array(taxonomy[vocabulary].codes, np.int32)
+        pools = rng.choice(codes, (THEMES, THEME_POOL))
+        frame[field] = [np.unique(rng.choice(pools[theme], rng.integers(2, 5))) for theme in themes]
+    return frame
+
+def exact_neighbors(catalog, row, top_k):
+    """Top game rows by exact Jaccard similarity with the game at row."""
+    rows, tokens = game_tokens(catalog)
+    own = np.unique(tokens[rows == row])
+    sizes = np.bincount(rows, minlength=len(catalog))
+    shared = np.bincount(rows[np.isin(tokens, own)], minlength=len(catalog))
+    jaccard = shared / np.maximum(sizes + len(own) - shared, 1)
+    jaccard[row] = -1
+    best = np.argsort(-jaccard, kind="stable")[:top_k]
+    # Ties at the k-th similarity are all right answers
+    return set(np.flatnonzero(jaccard >= jaccard[best[-1]])), set(best)
+
+def run(sizes=CATALOG_SIZES):
+    rng = np.random.default_rng(1)
+    results = {}
+    for size in sizes:
+        catalog = GameCatalog(themed_frame(size))
+        path = os.path.join(tempfile.mkdtemp(prefix="wwpbg-similar-"), "similar_games.npy")
+        start = time.perf_counter()
+        index = build_similarity_index(catalog, path)
+        build = time.perf_counter() - start
+
+        similar_games = SimilarGames(path)
+        game_ids = rng.choice(catalog.ids, LOOKUPS)
+        start = time.perf_counter()
+        for game_id in game_ids:
+            similar_games.neighbors(game_id)
+        lookup = (time.perf_counter() - start) / LOOKUPS
+
+        found = expected = 0
+        for row in rng.choice(len(catalog), RECALL_SAMPLE, replace=False):
+            neighbors = [int(game_id) for game_id, _ in similar_games.neighbors(catalog.ids[row])]
+            accepted, best = exact_neighbors(catalog, row, index["neighbors"].shape[1])
+            found += len(set(catalog.rows_of(neighbors)) & accepted)
+            expected += len(best)
+        results[size] = {
+            "build_s": build,
+            "file_mb": os.path.getsize(path) / 2 ** 20,
+            "lookup_us": lookup * 1e6,
+            "recall": found / expected,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for size, result in run().items():
+        print(f"{size:>8} games: built in {result['build_s']:.1f} s, {result['file_mb']:.1f} MB, "
+              f"lookup {result['lookup_us']:.0f} us, recall {result['recall']:.0%}")
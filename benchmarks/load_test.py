@@ -0,0 +1,314 @@
+"""
+Concurrent sessions load test of a real Streamlit server, offline.
+
+The app is started with `streamlit run`, pointed at the local BGG / predict
+stub (benchmarks/stub_server.py). Each simulated user opens its own
+websocket session, speaking the browser's protocol, and runs the flow:
+home page, then predictGames through one of the home buttons, random
+cluster / playing time / taxonomy picks, "Find games", then "More infos"
+on one of the results.
+
+For each concurrency level the report gives the throughput (flows per
+second), the latency percentiles of every step and the server memory.
+
+    python -m benchmarks.load_test --sessions 1,2,4,8 --flows 3 --latency 0.3
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_server import StubConfig, start_stub_server
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ("home", "predict_page", "filter_change", "find_games", "more_infos")
+HOME_BUTTONS = {  # home button: does the option ask for a BGG user ID
+    "📈 Find the right games for a friend": False,
+    "🔎 Predict based on my BGG": True,
+    "🤖 Fit gamelist for tonight": True,
+}
+RUN_TIMEOUT = 120  # seconds
+
+
+def rss_mb(pid):
+    """Resident memory of a process, in MB."""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"count": len(ordered), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+#-------------------------------------------------------------------------
+#     Streamlit server and browser sessions
+#-------------------------------------------------------------------------
+def start_app_server(stub_url, workdir, port):
+    """Runs the app with `streamlit run`, waits until it is healthy. Returns the process."""
+    secrets_path = os.path.join(workdir, "secrets.toml")
+    with open(secrets_path, "w") as f:
+        f.write(f'cloud_api_uri = "{stub_url}/"\n')
+    env = dict(os.environ,
+               BGG_BASE_URL=stub_url,
+               BGG_CACHE_PATH=os.path.join(workdir, "bgg_cache.sqlite3"),
+               HOT_GAMES_SNAPSHOT_PATH=os.path.join(workdir, "hot_games.json"),
+               BGG_IMAGE_CACHE_DIR=os.path.join(workdir, "images"))
+    env.pop("API_URI", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--server.enableXsrfProtection", "false",
+         "--browser.gatherUsageStats", "false", "--secrets.files", secrets_path],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return server
+        except requests.ConnectionError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("The Streamlit server did not start")
+
+
+class BrowserSession:
+    """
+    One websocket session, sending what the browser would: script reruns
+    with the widget values, and the ID of the fragment a widget belongs to.
+    """
+    def __init__(self, port):
+        self.port = port
+        self.connection = None
+        self.page_script_hash = ""
+        self.widgets = {}  # id: (kind, label, fragment_id, proto)
+        self.values = {}  # id: WidgetState, for the values the user has set
+
+    def __enter__(self):
+        from websockets.sync.client import connect
+
+        self.connection = connect(f"ws://127.0.0.1:{self.port}/_stcore/stream", subprotocols=["streamlit"],
+                                  max_size=None, open_timeout=30).__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+
+    def rerun(self, trigger=None, fragment_id=""):
+        """Sends a rerun and waits until the script has finished, through reruns and page switches."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page_script_hash
+        message.rerun_script.fragment_id = fragment_id
+        states = list(self.values.values()) + ([trigger] if trigger else [])
+        message.rerun_script.widget_states.widgets.extend(states)
+        self.connection.send(message.SerializeToString())
+
+        deadline = time.monotonic() + RUN_TIMEOUT
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self.connection.recv(timeout=max(0.1, deadline - time.monotonic())))
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                if forward.new_session.page_script_hash != self.page_script_hash:
+                    self.widgets, self.values = {}, {}
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self.add_element(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                status = forward.script_finished
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Script compile error")
+                if status != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def add_element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            raise RuntimeError(f"{element.exception.type}: {element.exception.message}")
+        proto = getattr(element, kind)
+        if getattr(proto, "id", ""):
+            self.widgets[proto.id] = (kind, getattr(proto, "label", ""), fragment_id, proto)
+
+    def find(self, label, kind=None):
+        return [widget_id for widget_id, (widget_kind, widget_label, _, _) in self.widgets.items()
+                if widget_label == label and kind in (None, widget_kind)]
+
+    def set_value(self, widget_id, field, value):
+        """Changes a widget value, then reruns its fragment (or the page)."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget_id)
+        if field == "string_array_value":
+            state.string_array_value.data.extend(value)
+        else:
+            setattr(state, field, value)
+        self.values[widget_id] = state
+        self.rerun(fragment_id=self.widgets[widget_id][2])
+
+    def click(self, widget_id):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.rerun(trigger=WidgetState(id=widget_id, trigger_value=True), fragment_id=self.widgets[widget_id][2])
+
+
+#-------------------------------------------------------------------------
+#     User flow
+#-------------------------------------------------------------------------
+class SimulatedUser:
+    def __init__(self, port, rng):
+        from constant.params import CLUSTER_MAP, PLAYING_TIME
+        from utils.taxonomy import load_taxonomy_index
+
+        self.port = port
+        self.rng = rng
+        self.clusters = list(CLUSTER_MAP.values())
+        self.playingtimes = list(PLAYING_TIME)
+        self.taxonomy = load_taxonomy_index()
+
+    def run_flow(self, samples):
+        """Runs the whole flow, appending each step's duration to samples[step]."""
+        def timed(step, func, *args):
+            start = time.perf_counter()
+            func(*args)
+            samples[step].append(time.perf_counter() - start)
+
+        with BrowserSession(self.port) as session:
+            timed("home", session.rerun)
+            button, asks_user_id = self.rng.choice(list(HOME_BUTTONS.items()))
+            timed("predict_page", session.click, session.find(button)[0])
+
+            if asks_user_id:
+                timed("filter_change", session.set_value, session.find("BGG user ID:")[0],
+                      "string_value", f"user{self.rng.randrange(1000)}")
+            if session.find("Select Game Cluster:"):
+                timed("filter_change", session.set_value, session.find("Select Game Cluster:")[0],
+                      "string_value", self.rng.choice(self.clusters))
+                timed("filter_change", session.set_value, session.find("Playing Time (in minutes):")[0],
+                      "string_value", self.rng.choice(self.playingtimes))
+                for label, vocabulary in (("Select category:", "category"), ("Select mechanic:", "mechanic")):
+                    if self.rng.random() < 0.5:
+                        timed("filter_change", session.set_value, session.find(label)[0],
+                              "string_array_value", [self.rng.choice(self.taxonomy[vocabulary].labels)])
+            timed("find_games", session.click, session.find("Find games")[0])
+
+            results = session.find("More infos", "button")
+            if not results:
+                raise RuntimeError("No game found")
+            timed("more_infos", session.click, self.rng.choice(results))
+
+
+def run_level(sessions, flows, port, server_pid, seed):
+    """Runs `sessions` users at once, `flows` flows each."""
+    samples = {step: [] for step in STEPS}
+    errors = []
+    lock = threading.Lock()
+    peak_rss = [rss_mb(server_pid)]
+
+    def user(index):
+        simulated = SimulatedUser(port, random.Random(seed * 1000 + index))
+        for _ in range(flows):
+            flow_samples = {step: [] for step in STEPS}
+            try:
+                simulated.run_flow(flow_samples)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                for step, values in flow_samples.items():
+                    samples[step] += values
+
+    done = threading.Event()
+    def watch_memory():
+        while not done.wait(0.2):
+            peak_rss[0] = max(peak_rss[0], rss_mb(server_pid))
+    watcher = threading.Thread(target=watch_memory, daemon=True)
+    watcher.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="user") as executor:
+        list(executor.map(user, range(sessions)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    watcher.join()
+    server_rss = rss_mb(server_pid)
+    peak_rss[0] = max(peak_rss[0], server_rss)  # the last sample can be up to 0.2s old
+    completed = len(samples["more_infos"])
+    return {
+        "sessions": sessions,
+        "flows": completed,
+        "errors": len(errors),
+        "first_errors": errors[:3],
+        "elapsed_s": elapsed,
+        "throughput_flows_per_s": completed / elapsed,
+        "server_rss_mb": server_rss,
+        "server_peak_rss_mb": peak_rss[0],
+        "load_generator_rss_mb": rss_mb(os.getpid()),
+        "steps": {step: percentiles(values) for step, values in samples.items()},
+    }
+
+def run(levels, flows, config, port=8599, seed=0):
+    stub, stub_url = start_stub_server(config)
+    server = start_app_server(stub_url, tempfile.mkdtemp(prefix="wwpbg-load-"), port)
+    try:
+        results = []
+        for sessions in levels:
+            results.append(run_level(sessions, flows, port, server.pid, seed))
+            print_level(results[-1])
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.shutdown()
+
+def print_level(result):
+    print(f"{result['sessions']:>3} sessions: {result['throughput_flows_per_s']:.2f} flows/s, "
+          f"{result['flows']} flows, {result['errors']} errors, "
+          f"server RSS {result['server_rss_mb']:.0f} MB (peak {result['server_peak_rss_mb']:.0f} MB), "
+          f"load generator RSS {result['load_generator_rss_mb']:.0f} MB")
+    for step, stats in result["steps"].items():
+        if stats:
+            print(f"      {step:>14}: p50 {stats['p50_ms']:7.0f} ms, p95 {stats['p95_ms']:7.0f} ms, "
+                  f"p99 {stats['p99_ms']:7.0f} ms")
+    for error in result["first_errors"]:
+        print(f"      error: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent sessions load test")
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma separated concurrency levels")
+    parser.add_argument("--flows", type=int, default=3, help="flows run by each session")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before each predict answer")
+    parser.add_argument("--bgg-latency", type=float, default=0.1, help="seconds before each BGG answer")
+    parser.add_argument("--games", type=int, default=50, help="games per predict answer")
+    parser.add_argument("--port", type=int, default=8599, help="port of the Streamlit server")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file the results are written to")
+    args = parser.parse_args()
+
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    os.chdir(ROOT_DIR)
+    config = StubConfig(latency=args.latency, bgg_latency=args.bgg_latency, games=args.games)
+    results = run([int(level) for level in args.sessions.split(",")], args.flows, config, args.port, args.seed)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"stub": vars(config), "levels": results}, f, indent=2)
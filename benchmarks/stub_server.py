@@ -0,0 +1,205 @@
+"""
+Local stand-in for BoardGameGeek and the prediction API, for offline runs.
+
+- /xmlapi2/hot, /xmlapi2/thing and /xmlapi/boardgame/<ids> answer from the
+  recorded responses in benchmarks/fixtures
+- /xmlapi2/collection answers 202 the first `collection_queued` times per
+  user, then a generated collection; with modifiedsince, only the games
+  modified since (the last `collection_changes` ones)
+- /predict_filters, /predict_party and /predict_userID answer generated
+  games, as a JSON array, or as NDJSON when `ndjson` is on and asked for
+- /images/... answers a JPEG, image URLs of the fixtures point here
+Latency and payload size are set through StubConfig.
+
+    python -m benchmarks.stub_server --port 8765 --latency 0.3 --games 50
+
+then point the app at it: BGG_BASE_URL=http://localhost:8765 and the
+`local_api_uri` secret set to http://localhost:8765/
+"""
+import argparse
+import io
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RECORDED_IMAGE_HOST = "https://cf.geekdo-images.com"
+PREDICT_ENDPOINTS = ("predict_filters", "predict_party", "predict_userID")
+NDJSON_TYPE = "application/x-ndjson"
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0  # seconds before each predict answer
+    bgg_latency: float = 0.0  # seconds before each BGG answer
+    games: int = 25  # games per predict answer
+    description_chars: int = 1000
+    ndjson: bool = False  # stream predict answers when the client accepts it
+    image_size: tuple = (600, 400)
+    collection_games: int = 200  # games per user collection
+    collection_changes: int = 5  # games modified since any date
+    collection_queued: int = 1  # 202 answers before a user's collection is ready
+    collection_pull: float = 0.0  # seconds predict_userID takes to pull a collection not sent to it
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read().decode("utf-8")
+
+def boardgame_response(game_ids, template=None):
+    """Legacy xmlapi answer for game_ids, each one a copy of the recorded game."""
+    template = template or load_fixture("boardgame_224517.xml")
+    game = re.search(r"<boardgame objectid=.*?</boardgame>", template, re.S).group(0)
+    games = [game.replace('objectid="224517"', f'objectid="{game_id}"', 1) for game_id in game_ids]
+    return template.replace(game, "\n".join(games))
+
+def predicted_games(endpoint, config):
+    return [
+        {
+            "@objectid": str(300000 + i),
+            "name": f"{endpoint} game {i}",
+            "age": 8 + i % 8,
+            "average": round(5 + (i * 37 % 50) / 10, 2),
+            "yearpublished": 2000 + i % 25,
+            "thumbnail": f"{RECORDED_IMAGE_HOST}/{300000 + i}__thumb/img/pic{300000 + i}.jpg",
+            "image": f"{RECORDED_IMAGE_HOST}/{300000 + i}__original/img/pic{300000 + i}.jpg",
+            "description": ("Lorem ipsum dolor sit amet. " * (config.description_chars // 28 + 1))[:config.description_chars],
+        }
+        for i in range(config.games)
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real servers
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    config = StubConfig()
+    base_url = ""
+    queued = None  # user: 202 answers sent
+    body = b""  # of a POST request
+    _image = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.route()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.body = self.rfile.read(length)
+        self.route()
+
+    def route(self):
+        url = urlsplit(self.path)
+        path = url.path
+        if path.strip("/") in PREDICT_ENDPOINTS:
+            time.sleep(self.config.latency)
+            if path.strip("/") == "predict_userID" and b"collection_owned" not in url.query.encode() + self.body:
+                time.sleep(self.config.collection_pull)
+            return self.send_predictions(path.strip("/"))
+        if path.startswith("/images/"):
+            return self.send(200, self.image(), "image/jpeg")
+        time.sleep(self.config.bgg_latency)
+        if path == "/xmlapi2/hot":
+            return self.send_xml(load_fixture("hot_boardgame.xml"))
+        if path == "/xmlapi2/thing":
+            ids = set(parse_qs(url.query).get("id", [""])[0].split(","))
+            thing = load_fixture("thing_hot.xml")
+            items = [item for item in re.findall(r"\t<item .*?</item>\n", thing, re.S)
+                     if re.search(r'id="(\d+)"', item).group(1) in ids]
+            head, tail = thing.split("\t<item ", 1)[0], "</items>\n"
+            return self.send_xml(head + "".join(items) + tail)
+        if path == "/xmlapi2/collection":
+            return self.send_collection(parse_qs(url.query))
+        match = re.match(r"/xmlapi/boardgame/([\d,]+)$", path)
+        if match:
+            return self.send_xml(boardgame_response(match.group(1).split(",")))
+        self.send(404, b"Not found", "text/plain")
+
+    def send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_xml(self, text):
+        # Images are served by the stub too
+        text = text.replace(RECORDED_IMAGE_HOST, f"{self.base_url}/images")
+        self.send(200, text.encode("utf-8"), "text/xml; charset=utf-8")
+
+    def send_predictions(self, endpoint):
+        games = predicted_games(endpoint, self.config)
+        for game in games:
+            for key in ("thumbnail", "image"):
+                game[key] = game[key].replace(RECORDED_IMAGE_HOST, f"{self.base_url}/images")
+        if self.config.ndjson and NDJSON_TYPE in self.headers.get("Accept", ""):
+            body = "".join(json.dumps(game) + "\n" for game in games)
+            return self.send(200, body.encode("utf-8"), NDJSON_TYPE)
+        self.send(200, json.dumps(games).encode("utf-8"), "application/json")
+
+    def send_collection(self, query):
+        user = query.get("username", [""])[0].casefold()
+        if self.queued.get(user, 0) < self.config.collection_queued:
+            self.queued[user] = self.queued.get(user, 0) + 1
+            return self.send(202, b"", "text/xml")
+        game_ids = range(300000, 300000 + self.config.collection_games)
+        if "modifiedsince" in query:
+            game_ids = game_ids[-self.config.collection_changes:]
+        items = "".join(
+            f'<item objecttype="thing" objectid="{game_id}" subtype="boardgame" collid="{game_id}">'
+            f'<name sortindex="1">Game {game_id}</name><stats><rating value="{game_id % 10 + 1}"/></stats>'
+            f'<status own="{game_id % 2}" lastmodified="2024-01-01 00:00:00"/></item>'
+            for game_id in game_ids
+        )
+        self.send_xml(f'<items totalitems="{len(game_ids)}">{items}</items>')
+
+    @classmethod
+    def image(cls):
+        if cls._image is None:
+            from PIL import Image
+
+            buffer = io.BytesIO()
+            Image.new("RGB", cls.config.image_size, (114, 125, 115)).save(buffer, "JPEG")
+            cls._image = buffer.getvalue()
+        return cls._image
+
+
+def start_stub_server(config=None, port=0):
+    """
+    Serves the stub from a daemon thread.
+    Returns (server, base_url), stop it with server.shutdown().
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Handlers are created per request, settings live on a per-server subclass
+    server.RequestHandlerClass = type("ConfiguredStubHandler", (StubHandler,),
+                                      {"config": config or StubConfig(), "base_url": base_url, "queued": {}})
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each predict answer")
+    parser.add_argument("--bgg-latency", type=float, default=0.0, help="seconds before each BGG answer")
+    parser.add_argument("--games", type=int, default=25, help="games per predict answer")
+    parser.add_argument("--description-chars", type=int, default=1000)
+    parser.add_argument("--ndjson", action="store_true", help="stream predict answers as NDJSON")
+    args = parser.parse_args()
+    config = StubConfig(latency=args.latency, bgg_latency=args.bgg_latency, games=args.games,
+                        description_chars=args.description_chars, ndjson=args.ndjson)
+    server, base_url = start_stub_server(config, args.port)
+    print(f"Stub server on {base_url}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
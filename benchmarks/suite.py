@@ -0,0 +1,214 @@
+"""
+Offline benchmark suite: no network needed.
+
+BGG answers come from the responses recorded in benchmarks/fixtures and the
+predict endpoints from the local stub (benchmarks/stub_server.py), both
+served on localhost. Caches live in a temporary directory, so every run
+starts cold.
+
+Cases:
+- fetch_hot_games (cold and warm caches) and get_bgg_top_games
+- game_info (cold and warm caches)
+- load_taxonomy_index (cold: JSON index read, and warm)
+- full page runs with Streamlit's AppTest: home, predictGames, one
+  "Find games" per predict endpoint, moreGameInfo
+
+Results are written as JSON. With --check the run fails when a case's
+median is above its threshold in benchmarks/thresholds.json.
+
+    python -m benchmarks.suite --output .cache/benchmarks.json --check
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.stub_server import StubConfig, start_stub_server
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+PREDICT_LABELS = {  # predict endpoint: option of the predictGames page
+    "predict_filters": "Game for a friend",
+    "predict_userID": "Based on my BGG",
+    "predict_party": "Games for tonight",
+}
+
+
+def setup_environment(workdir, base_url):
+    """Points the app at the stub, with caches in workdir. Must run before any app import."""
+    os.environ["BGG_BASE_URL"] = base_url
+    os.environ["BGG_CACHE_PATH"] = os.path.join(workdir, "bgg_cache.sqlite3")
+    os.environ["HOT_GAMES_SNAPSHOT_PATH"] = os.path.join(workdir, "hot_games.json")
+    os.environ["BGG_IMAGE_CACHE_DIR"] = os.path.join(workdir, "images")
+    # Time the code, not the wait for BGG rate limit tokens
+    os.environ["BGG_RATE_LIMIT"] = "1000"
+    os.environ["BGG_BURST"] = "1000"
+    os.environ.pop("API_URI", None)
+    os.chdir(ROOT_DIR)  # The pages read their data files relatively
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+def measure(func, repeat, setup=None):
+    """Returns the duration of each call, in seconds. setup is not timed."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+#-------------------------------------------------------------------------
+#     Cases
+#-------------------------------------------------------------------------
+def bench_hot_games(repeat):
+    from utils.game_cache import get_backend
+    from utils.hot_games import fetch_hot_games
+
+    return {
+        "fetch_hot_games_cold": measure(fetch_hot_games, repeat, setup=get_backend().clear),
+        "fetch_hot_games_warm": measure(fetch_hot_games, repeat),
+    }
+
+def bench_game_info(repeat):
+    from pages.moreGameInfo import game_info
+    from utils.game_cache import get_backend
+
+    return {
+        "game_info_cold": measure(lambda: game_info("224517"), repeat, setup=get_backend().clear),
+        "game_info_warm": measure(lambda: game_info("224517"), repeat),
+    }
+
+def bench_taxonomy(repeat):
+    from utils.taxonomy import load_taxonomy_index
+
+    return {
+        "load_taxonomy_index_cold": measure(load_taxonomy_index, repeat, setup=load_taxonomy_index.cache_clear),
+        "load_taxonomy_index_warm": measure(load_taxonomy_index, repeat),
+    }
+
+def new_app(page, base_url, **session_state):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT_DIR, page), default_timeout=120)
+    app.secrets["cloud_api_uri"] = f"{base_url}/"
+    for key, value in session_state.items():
+        app.session_state[key] = value
+    return app
+
+def run_page(app):
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"{app.exception[0].message}")
+
+def bench_pages(repeat, base_url):
+    from utils.metrics import get_metrics
+    from utils.predict_cache import get_predict_cache
+
+    results = {}
+    home = new_app("app.py", base_url)
+    run_page(home)  # Loads the hot games snapshot in the background
+    results["page_home"] = measure(lambda: run_page(home), repeat)
+    results["get_bgg_top_games"] = get_metrics().samples("function_seconds", function="get_bgg_top_games")[-repeat:]
+
+    predict = new_app("pages/predictGames.py", base_url, type_from_home=PREDICT_LABELS["predict_filters"])
+    run_page(predict)
+    results["page_predict_rerun"] = measure(lambda: run_page(predict), repeat)
+
+    for endpoint, option in PREDICT_LABELS.items():
+        apps = []
+        def setup():
+            get_predict_cache().clear()
+            app = new_app("pages/predictGames.py", base_url, type_from_home=option)
+            run_page(app)
+            if option != PREDICT_LABELS["predict_filters"]:
+                app.text_input(key="user_id").input("benchmark")
+            next(button for button in app.button if button.label == "Find games").click()
+            apps.append(app)
+        results[f"page_find_games_{endpoint}"] = measure(lambda: run_page(apps[-1]), repeat, setup=setup)
+
+    more = new_app("pages/moreGameInfo.py", base_url, current_id="224517")
+    run_page(more)
+    results["page_more_game_info"] = measure(lambda: run_page(more), repeat)
+    return results
+
+def run(repeat, config):
+    server, base_url = start_stub_server(config)
+    workdir = tempfile.mkdtemp(prefix="wwpbg-bench-")
+    setup_environment(workdir, base_url)
+    try:
+        samples = {}
+        samples.update(bench_hot_games(repeat))
+        samples.update(bench_game_info(repeat))
+        samples.update(bench_taxonomy(repeat))
+        samples.update(bench_pages(repeat, base_url))
+    finally:
+        server.shutdown()
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+#-------------------------------------------------------------------------
+#     Thresholds
+#-------------------------------------------------------------------------
+def load_thresholds(path=THRESHOLDS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+def check(results, thresholds):
+    """Returns the cases whose median is above their threshold."""
+    return [
+        {"case": name, "median_ms": results[name]["median_ms"], "threshold_ms": threshold}
+        for name, threshold in thresholds.items()
+        if name in results and results[name]["median_ms"] > threshold
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each predict answer")
+    parser.add_argument("--games", type=int, default=50, help="games per predict answer")
+    parser.add_argument("--description-chars", type=int, default=1000)
+    parser.add_argument("--ndjson", action="store_true", help="stream predict answers as NDJSON")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--check", action="store_true", help="fail when a case is above its threshold")
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, games=args.games,
+                        description_chars=args.description_chars, ndjson=args.ndjson)
+    results = run(args.repeat, config)
+    regressions = check(results, load_thresholds())
+    report = {
+        "time": time.time(),
+        "python": platform.python_version(),
+        "stub": {"latency": config.latency, "games": config.games,
+                 "description_chars": config.description_chars, "ndjson": config.ndjson},
+        "results": results,
+        "regressions": regressions,
+    }
+    for name, result in results.items():
+        print(f"{name:>36}: median {result['median_ms']:8.1f} ms, p95 {result['p95_ms']:8.1f} ms")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']}: {regression['median_ms']:.1f} ms > {regression['threshold_ms']} ms")
+    if args.check and regressions:
+        sys.exit(1)
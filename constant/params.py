@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 
 ####### Params for categroical values #######
@@ -33,6 +35,7 @@ CLUSTER_MAP = {
     2: "Must Have → Popular well-rated classics",
     3: "Challengers → Mid-tier popularity games"
 }
+CLUSTER_IDS = {label: cluster for cluster, label in CLUSTER_MAP.items()}
 
 CLUSTER_CENTERS = [
     #     average  ,   User rated
@@ -41,3 +44,13 @@ CLUSTER_CENTERS = [
     [7.65193971e+00, 6.26958406e+04],  # Cluster 2
     [7.31720972e+00, 1.62397414e+04]  # Cluster 3
 ]
+
+####### Params for BoardGameGeek API #######
+
+BGG_BASE_URL = os.environ.get("BGG_BASE_URL", "https://boardgamegeek.com")  # a local stub in benchmarks
+BGG_HOT_URL = f"{BGG_BASE_URL}/xmlapi2/hot?type=boardgame"
+BGG_THING_URL = f"{BGG_BASE_URL}/xmlapi2/thing"
+HOT_GAMES_TTL = 60 * 60  # seconds, the hot list only moves a few times a day
+BGG_BOARDGAME_URL = f"{BGG_BASE_URL}/xmlapi/boardgame/"
+BGG_COLLECTION_URL = f"{BGG_BASE_URL}/xmlapi2/collection"
+BGG_MAX_BATCH_SIZE = 20  # game IDs per BGG request
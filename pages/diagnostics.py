@@ -0,0 +1,92 @@
+import streamlit as st
+import pandas as pd
+
+from utils.diagnostics import collect, to_json, to_prometheus
+from utils.hot_games import get_hot_games_snapshot
+from utils.metrics import get_metrics
+
+
+def format_labels(labels):
+    return ", ".join(f"{key}={value}" for key, value in labels.items())
+
+def show_timings(histograms):
+    st.markdown("### ⏱️ Timings")
+    if not histograms:
+        st.info("Nothing timed yet, use the app then refresh.")
+        return
+    st.dataframe(pd.DataFrame([
+        {
+            "metric": histogram["name"],
+            "labels": format_labels(histogram["labels"]),
+            "count": histogram["count"],
+            "p50 (ms)": histogram["p50"] * 1000,
+            "p95 (ms)": histogram["p95"] * 1000,
+            "p99 (ms)": histogram["p99"] * 1000,
+            "max (ms)": histogram["max"] * 1000,
+            "total (s)": histogram["sum"],
+        }
+        for histogram in histograms
+    ]), hide_index=True, use_container_width=True)
+
+def show_values(title, values):
+    st.markdown(f"### {title}")
+    if not values:
+        st.info("No data yet.")
+        return
+    st.dataframe(pd.DataFrame([
+        {"metric": value["name"], "labels": format_labels(value["labels"]), "value": value["value"]}
+        for value in values
+    ]), hide_index=True, use_container_width=True)
+
+def format_snapshot_age(snapshot):
+    """Short human readable age of a hot games snapshot."""
+    age = snapshot.age()
+    if age is None:
+        return f"Hot list snapshot: {snapshot.source}, never refreshed"
+    minutes = int(age // 60)
+    when = f"{minutes // 60}h{minutes % 60:02d}" if minutes >= 60 else f"{minutes} min"
+    return f"Hot list snapshot: {snapshot.source}, updated {when} ago"
+
+def show_profiles():
+    st.markdown("### 🔬 Profiles")
+    st.toggle("Profile my page reruns", key="profile_reruns",
+              help="Runs each full rerun of the other pages under cProfile, for this session only")
+    profiles = st.session_state.get('profiles', {})
+    if not profiles:
+        st.caption("No profile yet: turn profiling on, then use the app.")
+    for page, report in profiles.items():
+        with st.expander(f"Last rerun of {page}"):
+            st.code(report, language=None)
+
+def show_diagnostics():
+    st.set_page_config(page_title="MG - Diagnostics", page_icon="🩺", layout="wide")
+    st.markdown("<h1 style='text-align: center;'>DIAGNOSTICS</h1>", unsafe_allow_html=True)
+
+    snapshot = collect()
+    col_refresh, col_reset, col_json, col_prometheus = st.columns(4)
+    with col_refresh:
+        st.button("🔄 Refresh", use_container_width=True)
+    with col_reset:
+        if st.button("🧹 Reset timings", use_container_width=True):
+            get_metrics().reset()
+            st.rerun()
+    with col_json:
+        st.download_button("⬇️ JSON", to_json(snapshot), file_name="diagnostics.json",
+                           mime="application/json", use_container_width=True)
+    with col_prometheus:
+        st.download_button("⬇️ Prometheus", to_prometheus(snapshot), file_name="metrics.prom",
+                           mime="text/plain", use_container_width=True)
+
+    show_timings(snapshot["histograms"])
+    col_counters, col_gauges = st.columns(2)
+    with col_counters:
+        show_values("🔢 Counters", snapshot["counters"])
+    with col_gauges:
+        show_values("📦 Caches, queues and clients", snapshot["gauges"])
+        st.caption(format_snapshot_age(get_hot_games_snapshot()))
+    show_profiles()
+
+
+if __name__ == '__main__':
+
+    show_diagnostics()
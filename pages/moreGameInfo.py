@@ -1,8 +1,21 @@
 import streamlit as st
-import requests
-import xmltodict
 import os
 
+from utils import metrics
+from utils.bgg_games import fetch_games
+from utils.diagnostics import profile_rerun
+from utils.image_cache import get_image_cache
+from utils.local_catalog import get_catalog
+from utils.name_search import MIN_QUERY_CHARS, get_name_index
+from utils.prefetch import get_prefetcher
+from utils.similar_games import get_similar_games
+
+DEFAULT_GAME_ID = '284818'
+COMPARE_MAX_GAMES = 6
+SIMILAR_GAMES_COLUMNS = 5
+OPTION_GAME_DETAILS = "Game details"
+OPTION_COMPARE_GAMES = "Compare games"
+
 
 def show_banner():
     # --- TOP BAR ---
@@ -25,79 +38,27 @@ def show_banner():
             if st.button("🔍 Back predict", key="Predict", use_container_width=True):
                 st.switch_page('pages/predictGames.py')
 
+def game_info(game_id):
+    '''
+    Retrieve the information of one game.
+    - Reads through the shared game cache, requests BGG API on a miss
+    - Returns data as a list of one dictionary, empty if BGG failed
+    '''
+    return list(fetch_games([game_id]).values())
+
 def show_bloc_game_info(game_id):
-        @st.cache_data
-        def game_info(game_id):
-            '''
-            Retrieve games information from a list of game IDs.
-            - Takes a list of game IDs
-            - Requests BGG API
-            - Returns data as a list of dictionaries
-            '''
-
-            list_column = ['@objectid','yearpublished',
-                        'minplayers', 'maxplayers',
-                        'playingtime','minplaytime',
-                        'maxplaytime', 'age', 'name',
-                        'description', 'thumbnail', 'image',
-                        'boardgamepublisher','boardgamedesigner', 'boardgameartist',
-                        'boardgamehonor', 'boardgamecategory',
-                        'boardgamefamily', 'boardgamemechanic','boardgamesubdomain',
-                        'statistics'
-                        ]
-            BASE_URL_BGG_GAME = 'https://boardgamegeek.com/xmlapi/boardgame/'
-            response = requests.get(BASE_URL_BGG_GAME +str(game_id)+'?stats=1')
-
-            if response.status_code != 200:
-                print(f"Request failed with status code {response.status_code}")
-                return []
-
-            data_dict = xmltodict.parse(response.content)
-
-            games = data_dict.get('boardgames', {}).get('boardgame', [])
-            if not isinstance(games, list):
-                games = [games]  # Ensure it's always a list
-
-            result = []
-            for game in games:
-                entry = {}
-                for key in list_column:
-                    value = game.get(key, '')
-                    if isinstance(value, dict):
-                        # If the value is a dictionary, get the '#text' field
-                        if key == 'statistics':
-                            entry['average'] = value.\
-                                get('ratings','').\
-                                get('average','')
-                            entry['averageweight'] = value.\
-                                get('ratings','').\
-                                get('averageweight','')
-                        else:
-                            entry[key] = value.get('#text', '')
-                        if key == 'name':
-                            if value.get('@primary', ''):
-                                entry['main_name'] = value.get('#text', '')
-                    elif isinstance(value, list):
-                        # If the value is a list, take the first element's '#text' field
-                        # entry[key] = value[0].get('#text', '') if value else ''
-                        if key == 'name':
-                            for v in value:
-                                if v.get('@primary', ''):
-                                    entry['main_name'] = v.get('#text', '')
-
-                        entry[key] = [v.get('#text', '') for v in value]
-                    else:
-                        # Keep the value or default to an empty string
-                        entry[key] = value or ''
-                result.append(entry)
-            # print(result)
-            return result
-        st.session_state['current_id'] = None
-
-        game = game_info(game_id)[0]
+        games = game_info(game_id)
+        if not games:
+            st.error("Could not load this game from BoardGameGeek, please try again later.")
+            return
+        game = games[0]
 
         col1,col2 = st.columns([1,2])
-        col1.image(game['image'],use_container_width = True)
+        # Never download during the render: the remote image until the hero variant is cached
+        hero = get_image_cache().get(game['image'], "hero", fetch=False)
+        if hero is None:
+            get_image_cache().warm([game['image']])
+        col1.image(hero or game['image'],use_container_width = True)
         if game.get('main_name'):
             col2.header(f"**{game['main_name']}**")
         bgg_url = f"https://boardgamegeek.com/boardgame/{game.get('@objectid')}"
@@ -179,6 +140,97 @@ def show_bloc_game_info(game_id):
                         else :
                             tab[idx].markdown(f"{game.get(key_dic)}")
 
+        show_more_like_this(game['@objectid'])
+
+def show_more_like_this(game_id):
+    """
+    Most similar games by categories, mechanics and families, listed from
+    the local index. Their details are prefetched, opening one is a cache hit.
+    """
+    similar_games = get_similar_games()
+    neighbors = similar_games.neighbors(game_id) if similar_games else []
+    if not neighbors:
+        return
+    get_prefetcher().prefetch([neighbor for neighbor, _ in neighbors])
+
+    st.markdown("#### More like this:")
+    catalog = get_catalog()
+    rows = catalog.rows_of([neighbor for neighbor, _ in neighbors]) if catalog else [-1] * len(neighbors)
+    for col, (neighbor, similarity), row in zip(st.columns(SIMILAR_GAMES_COLUMNS) * len(neighbors), neighbors, rows):
+        with col.container(border=True):
+            st.markdown(f"**{catalog.text['name'][row] if row >= 0 else f'BGG #{neighbor}'}**")
+            st.caption(f"{similarity:.0%} similar")
+            if st.button('More infos', key=f"similar-{neighbor}"):
+                st.session_state['current_id'] = neighbor
+                st.rerun()
+
+def show_game_search():
+    """Search box over the names of the local catalog, a result opens its game page."""
+    name_index = get_name_index()
+    if name_index is None:
+        return
+    query = st.text_input("Search a game by name:", key="game_search", placeholder="Catan, Aventuriers du rail...")
+    results = name_index.search(query)
+    if len(query.strip()) >= MIN_QUERY_CHARS and not results:
+        st.caption("No game of the local catalog has this name.")
+    for game_id, name in results:
+        if st.button(name, key=f"search-{game_id}"):
+            st.session_state['current_id'] = game_id
+            st.rerun()
+
+def get_compare_ids():
+    """
+    Lets the user pick the games to compare.
+    - Shortlist from the last prediction results
+    - Plus any BGG IDs typed in, comma separated
+    """
+    shortlist = {
+        f"{game.name} ({game.objectid})": game.objectid
+        for game in st.session_state.get('games_list', [])
+    }
+    picked = st.multiselect("Games from your results:", list(shortlist),
+                            default=list(shortlist)[:min(5, COMPARE_MAX_GAMES)], max_selections=COMPARE_MAX_GAMES)
+    typed = st.text_input("Other BGG IDs (comma separated):", key="compare_ids")
+
+    game_ids = [shortlist[label] for label in picked]
+    game_ids += [game_id.strip() for game_id in typed.split(",") if game_id.strip().isdigit()]
+    return list(dict.fromkeys(game_ids))[:COMPARE_MAX_GAMES]
+
+def show_compare_games(game_ids):
+    """Shows several games side by side, fetched in a single batched BGG request."""
+    if not game_ids:
+        st.info("Pick some games to compare.")
+        return
+
+    games = list(fetch_games(game_ids).values())
+    if not games:
+        st.error("Could not load these games from BoardGameGeek, please try again later.")
+        return
+
+    list_numerical = [["average","Average rating"],
+                    ["averageweight","Complexity rating"],
+                    ["yearpublished","Year published"],
+                    ["minplayers","Minimun number of players"],
+                    ["maxplayers","Maximun number of players" ],
+                    ["age", "Age"],
+                    ["playingtime","Playing time"]]
+    list_taxonomy = [["boardgamecategory","Categories"],
+                    ["boardgamemechanic","Mechanics"]]
+
+    for col, game in zip(st.columns(len(games)), games):
+        with col.container(border=True):
+            if game.get('image'):
+                st.image(game['image'], use_container_width=True)
+            st.subheader(game.get('main_name') or game.get('@objectid'))
+            bgg_url = f"https://boardgamegeek.com/boardgame/{game.get('@objectid')}"
+            st.markdown(f"*<a href='{bgg_url}' target='_blank'>BGG Info</a>*", unsafe_allow_html=True)
+            for key_dic, title in list_numerical:
+                value = game.get(key_dic)
+                st.markdown(f"__{title}__: {round(float(value),1) if value not in ('', None) else 'N/A'}")
+            for key_dic, title in list_taxonomy:
+                st.markdown(f"__{title}__")
+                st.markdown("\n".join("- " + li_ for li_ in game.get(key_dic, [])) or "N/A")
+
 def show_more_game_info(game_id: int = 224517):
     st.set_page_config(
         page_title="MG - Game infos",
@@ -187,13 +239,20 @@ def show_more_game_info(game_id: int = 224517):
         initial_sidebar_state="auto",
         menu_items=None
     )
-    show_banner()
-    if st.session_state['current_id']:
-        show_bloc_game_info(st.session_state['current_id'])
+    with metrics.timer("page_render_seconds", page="moreGameInfo", phase="top_bar"):
+        show_banner()
+    option = st.segmented_control("View", [OPTION_GAME_DETAILS, OPTION_COMPARE_GAMES],
+                                  default=OPTION_GAME_DETAILS, selection_mode="single", label_visibility="collapsed")
+    if option == OPTION_COMPARE_GAMES:
+        with metrics.timer("page_render_seconds", page="moreGameInfo", phase="compare"):
+            show_compare_games(get_compare_ids())
     else:
-        show_bloc_game_info('284818')
+        with metrics.timer("page_render_seconds", page="moreGameInfo", phase="game_details"):
+            show_game_search()
+            show_bloc_game_info(st.session_state.get('current_id') or DEFAULT_GAME_ID)
 
 
 if __name__ == '__main__':
 
-    show_more_game_info()
+    with profile_rerun("moreGameInfo"), metrics.timer("page_render_seconds", page="moreGameInfo", phase="total"):
+        show_more_game_info()
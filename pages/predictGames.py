@@ -1,8 +1,20 @@
 import streamlit as st
 import requests
-import pandas as pd
 import os
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pages.moreGameInfo import show_more_game_info
+from utils import http_client, local_catalog, metrics
+from utils.collection_sync import COLLECTION_MODE, collection_params, get_collection_sync
+from utils.diagnostics import profile_rerun
+from utils.filter_encoding import encode_filters, use_post
+from utils.game_results import GameResult, as_number, project_games
+from utils.image_cache import get_image_cache
+from utils.predict_cache import get_predict_cache
+from utils.predict_stream import STREAM_ACCEPT, iter_predictions
+from utils.prefetch import get_prefetcher
+from utils.taxonomy import load_taxonomy_index
 
 from constant.params import *
 
@@ -19,27 +31,23 @@ OPTION_PLAYLIST_FOR_TONIGHT = "Games for tonight"
 OPTION_BOARD_GAME_LIBRARY = "Based on my BGG"
 
 ERROR_API_RESPONSE_FORMAT = "The API response is not in the expected format."
+ERROR_BACKEND_UNAVAILABLE = "The prediction service is unavailable, please try again later."
 ERROR_INVALID_BGG_USER_ID = "Please enter a valid BGG user ID!"
+INFO_LOCAL_GAMES = "The prediction service is unavailable or too slow, these games come from the local catalog."
 
-BASE_ENDPOINTS_URL = "https://api-326525614739.europe-west1.run.app/"
+ALL_FAMILY_GROUPS = "All families"
+MAX_SCENARIOS = 8
+
+PAGE_SIZES = [10, 25, 50]
+SCENARIO_PAGE_SIZE = PAGE_SIZES[0]  # per scenario column
+SORT_RELEVANCE = "Relevance"
+SORT_OPTIONS = [SORT_RELEVANCE, "Name", "Age", "Rating"]
 
 #-------------------------------------------------------------------------
 #
 #     FUNCTIONS
 #
 #-------------------------------------------------------------------------
-@st.cache_data
-def load_parquet_data():
-    file_path_category = './categories_data/category_data.parquet'
-    file_path_family = './categories_data/family_data.parquet'
-    file_path_mechanic = './categories_data/mechanic_data.parquet'
-
-    df_category = pd.read_parquet(file_path_category)
-    df_family = pd.read_parquet(file_path_family)
-    df_mechanic = pd.read_parquet(file_path_mechanic)
-
-    return df_category, df_family, df_mechanic
-
 def get_user_input():
     user_id = st.text_input("BGG user ID:", key="user_id")
     game_option = st.selectbox(
@@ -49,6 +57,19 @@ def get_user_input():
     )
     return user_id, game_option
 
+def show_collection_status(user_id):
+    """Sync state of the user's BGG collection, the sync starts as soon as the ID is typed."""
+    if COLLECTION_MODE != "local" or not user_id:
+        return
+    collection_sync = get_collection_sync()
+    collection = collection_sync.request(user_id)
+    if collection is None:
+        st.caption("⏳ Syncing your BGG collection in the background...")
+        return
+    minutes = int((time.time() - collection["synced_at"]) // 60)
+    syncing = " · updating..." if collection_sync.is_syncing(user_id) else ""
+    st.caption(f"📚 BGG collection: {len(collection['items'])} games, synced {minutes} min ago{syncing}")
+
 def get_game_details():
     cluster = st.selectbox("Select Game Cluster:", list(CLUSTER_MAP.values()), key="cluster")
     playingtime = st.selectbox("Playing Time (in minutes):", list(PLAYING_TIME.keys()), key="playingtime")
@@ -56,15 +77,20 @@ def get_game_details():
     age = st.selectbox("Minimum Age:", list(AGE.keys()), key="age")
     yearpublished = st.selectbox("Year Published:", list(YEAR_PUBLISHED.keys()), key="yearpublished")
 
-    df_category, df_family, df_mechanic = load_parquet_data() # Done once only!
+    taxonomy = load_taxonomy_index() # Done once only!
+
+    category_options = [""] + taxonomy["category"].labels
+    mechanic_options = [""] + taxonomy["mechanic"].labels
 
-    category_options = [""] + df_category['boardgamecategory'].dropna().unique().tolist()
-    mechanic_options = [""] + df_mechanic['boardgamemechanic'].dropna().unique().tolist()
-    family_options = [""] + df_family['boardgamefamily'].dropna().unique().tolist()
+    # Narrow the long family list server side, keeping what is already selected
+    family_group = st.selectbox("Family group:", [ALL_FAMILY_GROUPS] + taxonomy["family"].group_names, key="family_group")
+    family_options = taxonomy["family"].search(group=None if family_group == ALL_FAMILY_GROUPS else family_group)
+    family_selected = st.session_state.get("boardgamefamily", [])
+    family_options = [""] + family_options + [family for family in family_selected if family not in family_options]
 
     boardgamecategory = st.multiselect("Select category:", category_options,  help="Select a category")
     boardgamemechanic = st.multiselect("Select mechanic:", mechanic_options,  help="Select a mechanic")
-    boardgamefamily = st.multiselect("Select family:", family_options,  help="Select a family")
+    boardgamefamily = st.multiselect("Select family:", family_options,  help="Select a family", key="boardgamefamily")
 
     return {
         "cluster": cluster,
@@ -77,23 +103,398 @@ def get_game_details():
         "boardgamefamily": boardgamefamily
     }
 
-def make_api_call(endpoint, params):
-    url = f"{st.secrets.cloud_api_uri}{endpoint}"
-    response = requests.get(url, params=params)
-    print(response.url)
+def get_scenarios(game_details):
+    """
+    Scenario mode: several clusters and/or playing times searched at once.
+    Returns a list of (label, game_details) variants, empty when off.
+    """
+    if not st.toggle("Compare scenarios", key="scenario_mode",
+                     help="Search several clusters and playing times at once"):
+        return []
+    clusters = st.multiselect("Clusters to compare:", list(CLUSTER_MAP.values()), key="scenario_clusters")
+    playingtimes = st.multiselect("Playing times to compare:", list(PLAYING_TIME.keys()), key="scenario_playingtimes")
+
+    scenarios = []
+    for cluster in clusters or [game_details["cluster"]]:
+        for playingtime in playingtimes or [game_details["playingtime"]]:
+            label = f"{cluster.split(' →')[0]} · {playingtime}"
+            scenarios.append((label, dict(game_details, cluster=cluster, playingtime=playingtime)))
+    if len(scenarios) > MAX_SCENARIOS:
+        st.warning(f"Only the first {MAX_SCENARIOS} scenarios will be searched.")
+    return scenarios[:MAX_SCENARIOS]
+
+def filter_params(game_details):
+    """Request parameters shared by predict_filters and predict_party."""
+    # Get the cluster index from the selection
+    selected_cluster = CLUSTER_IDS[game_details["cluster"]]
+    # Extract average and usersrated from CLUSTER_CENTERS
+    average, usersrated = CLUSTER_CENTERS[selected_cluster]
+
+    return {
+        "average": average,
+        "usersrated": float(usersrated),
+        "playingtime": PLAYING_TIME[game_details["playingtime"]],
+        "minplayers": game_details["minplayers"],
+        "age": AGE[game_details["age"]],
+        "yearpublished": YEAR_PUBLISHED[game_details["yearpublished"]],
+        **encode_filters(game_details),
+    }
+
+def call_backend(endpoint, params, base_uri=None):
+    url = f"{base_uri or st.secrets.cloud_api_uri}{endpoint}"
+    # Ask for a streamed answer, the body is read as it arrives
+    headers = {"Accept": STREAM_ACCEPT}
+    if use_post(url, params):
+        # JSON has no NaN, "Any" values are sent as null
+        body = {key: None if isinstance(value, float) and math.isnan(value) else value
+                for key, value in params.items()}
+        response = http_client.post(url, json=body, headers=headers, stream=True)
+    else:
+        response = http_client.get(url, params=params, headers=headers, stream=True)
     return response
 
-def handle_api_response(response):
-    if response.status_code == 200:
-        games = response.json()
-        if isinstance(games, list) and all(isinstance(game, dict) for game in games):
-            st.session_state['games_list'] = games
+def read_predictions(response, on_game=None):
+    """
+    Reads the games of a (possibly streamed) response one by one,
+    calling on_game for each as soon as it arrives.
+    Returns (games, error message).
+    """
+    if response.status_code != 200:
+        response.close()
+        return [], f"API call error: {response.status_code}"
+    games = []
+    try:
+        for game in iter_predictions(response):
+            if not isinstance(game, dict):
+                raise ValueError(ERROR_API_RESPONSE_FORMAT)
+            games.append(game)
+            if on_game:
+                on_game(game)
+    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.Timeout):
+        # The connection dropped in the middle of the stream
+        return games, ERROR_BACKEND_UNAVAILABLE
+    except (ValueError, requests.RequestException):
+        return games, ERROR_API_RESPONSE_FORMAT
+    finally:
+        response.close()
+    return games, None
+
+def make_api_call(endpoint, params, on_game=None, base_uri=None):
+    """
+    Calls a predict endpoint, without any Streamlit call so that it can
+    also run in worker threads.
+    - Identical requests, from any session, are answered once by the backend
+    - on_game is called for each game, as soon as it is received
+    - predict_filters can be answered by the local catalog (utils.local_catalog)
+    Returns (games, error message).
+    """
+    streamed = []
+    def on_streamed_game(game):
+        streamed.append(game)
+        if on_game:
+            on_game(game)
+
+    # A raced call may end in a worker thread, its games are not streamed
+    on_received = None if local_catalog.races(endpoint) else on_streamed_game
+    def call():
+        # Backend time, body included: the HTTP client only sees the headers
+        with metrics.timer("predict_backend_seconds", endpoint=endpoint):
+            try:
+                response = call_backend(endpoint, params, base_uri)
+            except requests.RequestException as e:
+                return [], f"API call error: {e}"
+            return read_predictions(response, on_received)
+
+    with metrics.timer("predict_call_seconds", endpoint=endpoint):
+        # Answered by the local catalog when the backend fails or is too slow
+        games, error = local_catalog.with_local_fallback(
+            endpoint, params, lambda: get_predict_cache().fetch(endpoint, params, call))
+    metrics.increment("predict_calls_total", endpoint=endpoint, outcome="error" if error else "ok")
+    if on_game:
+        # Answered from the cache or by another session's call
+        for game in games[len(streamed):]:
+            on_game(game)
+    return games, error
+
+def change_scenario_page(idx, step):
+    pages = st.session_state.setdefault('scenario_pages', {})
+    pages[idx] = pages.get(idx, 0) + step
+
+def show_scenario_games(idx, games, error):
+    """
+    Compact list of one scenario's results, one page of SCENARIO_PAGE_SIZE
+    games at a time: a rerun builds the same number of cards whatever the
+    number of results.
+    """
+    if error:
+        st.error(error)
+    elif not games:
+        st.info("No games found.")
+    page_count = max(1, math.ceil(len(games) / SCENARIO_PAGE_SIZE))
+    pages = st.session_state.setdefault('scenario_pages', {})
+    page = pages[idx] = min(max(pages.get(idx, 0), 0), page_count - 1)
+    for game in games[page * SCENARIO_PAGE_SIZE:(page + 1) * SCENARIO_PAGE_SIZE]:
+        st.markdown(f"**{game.name}**  \n*Age:* {game.age}")
+        if st.button('More infos', key=f"scenario-{idx}-{game.objectid}"):
+            st.session_state['current_id'] = game.objectid
+            st.switch_page('pages/moreGameInfo.py')
+
+    if page_count > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("◀", key=f"scenario-{idx}-previous", disabled=page == 0,
+                      on_click=change_scenario_page, args=(idx, -1))
+        with col_page:
+            st.markdown(f"<div style='text-align: center;'>{page + 1} / {page_count}</div>", unsafe_allow_html=True)
+        with col_next:
+            st.button("▶", key=f"scenario-{idx}-next", disabled=page == page_count - 1,
+                      on_click=change_scenario_page, args=(idx, 1))
+
+def run_scenarios(scenarios):
+    """
+    Searches all scenarios concurrently and renders each one as soon as it
+    is answered: the total wait is the slowest call, not the sum.
+    Returns a list of (label, games, error), in scenario order.
+    """
+    placeholders = []
+    for col, (label, _, _) in zip(st.columns(len(scenarios)), scenarios):
+        col.markdown(f"#### {label}")
+        placeholders.append(col.empty())
+        placeholders[-1].info("Searching...")
+
+    results = [None] * len(scenarios)
+    st.session_state['scenario_pages'] = {}
+    base_uri = st.secrets.cloud_api_uri
+    with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+        futures = {
+            executor.submit(make_api_call, endpoint, params, base_uri=base_uri): idx
+            for idx, (_, endpoint, params) in enumerate(scenarios)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            games, error = future.result()
+            results[idx] = (scenarios[idx][0], project_games(games), error)
+            with placeholders[idx].container():
+                show_scenario_games(idx, results[idx][1], error)
+
+    all_games = [game for _, games, _ in results for game in games]
+    get_prefetcher().prefetch([game.objectid for game in all_games])
+    return results
+
+def show_scenario_results(results):
+    for idx, (col, (label, games, error)) in enumerate(zip(st.columns(len(results)), results)):
+        with col:
+            st.markdown(f"#### {label}")
+            show_scenario_games(idx, games, error)
+
+def handle_api_response(games, error):
+    """
+    Stores the results, projected to compact records: the session keeps
+    what the cards show, not the full backend answer.
+    Returns the stored records.
+    """
+    if error:
+        st.error(error)
+    games = project_games(games)
+    st.session_state['games_list'] = games
+    st.session_state['results_page'] = 0
+    if games:
+        # Warm the game details cache before the user clicks "More infos"
+        get_prefetcher().prefetch([game.objectid for game in games])
+        get_image_cache().warm([game.thumbnail for game in games])
+    return games
+
+def show_game_card(game, key_prefix=""):
+    col_img, col_details, col_button = st.columns([1, 4, 1])
+    with col_img:
+        if game.has_image:
+            thumbnail = get_image_cache().get(game.thumbnail, "thumbnail", fetch=False)
+            st.image(thumbnail or game.thumbnail, width=100)
         else:
-            st.session_state['games_list'] = []
-            st.error(ERROR_API_RESPONSE_FORMAT)
+            st.write("No image available.")
+    with col_details:
+        st.markdown(f"**Name:** {game.name}")
+        st.markdown(f"**Age:** {game.age}")
+        st.markdown(f"**Description:** {game.description}...")
+
+        bgg_url = f"https://boardgamegeek.com/boardgame/{game.objectid}"
+
+    with col_button :
+        if st.button('More infos',key = f"{key_prefix}{game.objectid}"):
+            st.session_state['current_id'] = game.objectid
+            st.switch_page('pages/moreGameInfo.py')
+        st.markdown(f" <a href='{bgg_url}' target='_blank'>BGG Info</a>", unsafe_allow_html=True)
+
+def sort_games(games, sort_by):
+    """
+    Games in the requested order, the backend order is kept for ties.
+    Games without the sorted value come last.
+    """
+    if sort_by == "Name":
+        return sorted(games, key=lambda game: str(game.name).casefold())
+    if sort_by == "Age":
+        ages = [as_number(game.age) for game in games]
+        order = sorted(range(len(games)), key=lambda i: (ages[i] is None, ages[i] or 0))
+    elif sort_by == "Rating":
+        order = sorted(range(len(games)), key=lambda i: (games[i].rating is None, -(games[i].rating or 0)))
+    else: # Relevance
+        return games
+    return [games[i] for i in order]
+
+def change_results_page(step):
+    st.session_state['results_page'] = st.session_state.get('results_page', 0) + step
+
+def reset_results_page():
+    st.session_state['results_page'] = 0
+
+def show_results_list(games):
+    """
+    One page of the results: only page size cards are built on each rerun,
+    whatever the number of results.
+    """
+    col_sort, col_size = st.columns([3, 1])
+    with col_sort:
+        sort_by = st.selectbox("Sort by:", SORT_OPTIONS, key="results_sort", on_change=reset_results_page)
+    with col_size:
+        page_size = st.selectbox("Games per page:", PAGE_SIZES, key="results_page_size", on_change=reset_results_page)
+
+    page_count = max(1, math.ceil(len(games) / page_size))
+    # Results or page size may have changed since the last click
+    page = min(max(st.session_state.get('results_page', 0), 0), page_count - 1)
+    st.session_state['results_page'] = page
+
+    for game in sort_games(games, sort_by)[page * page_size:(page + 1) * page_size]:
+        show_game_card(game)
+
+    if page_count > 1:
+        col_prev, col_page, col_next = st.columns([1, 4, 1])
+        with col_prev:
+            st.button("◀ Previous", key="results_previous", disabled=page == 0,
+                      on_click=change_results_page, args=(-1,))
+        with col_page:
+            st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {page_count} · {len(games)} games</div>",
+                        unsafe_allow_html=True)
+        with col_next:
+            st.button("Next ▶", key="results_next", disabled=page == page_count - 1,
+                      on_click=change_results_page, args=(1,))
+
+@st.fragment
+@metrics.timed("page_render_seconds", page="predictGames", phase="filter_panel")
+def show_filter_panel():
+    """
+    Left panel, rerun on its own: editing the filters does not redraw the
+    top bar nor the results. Only "Find games" reruns the whole page.
+    """
+    choices = [OPTION_BOARD_GAME_LIBRARY, OPTION_OFFER_TO_NEPHEW, OPTION_PLAYLIST_FOR_TONIGHT]
+    option = st.segmented_control("", choices,default = st.session_state['type_from_home'], selection_mode="single")
+
+    scenarios = []
+    if option == OPTION_BOARD_GAME_LIBRARY:
+        user_id, game_option = get_user_input()
+        show_collection_status(user_id)
+    elif option == OPTION_PLAYLIST_FOR_TONIGHT:
+        user_id, game_option = get_user_input()
+        game_details = get_game_details()
+        ratio_filter = st.slider(label="Ratio filtered games/User games (%)", min_value=10,max_value=90,value=90, step=5)
+        scenarios = get_scenarios(game_details)
+    else: # "What can I offer to my nephew?"
+        game_details = get_game_details()
+        scenarios = get_scenarios(game_details)
+
+    col_left, col_right = st.columns([3, 1])
+    with col_right:
+        if st.button("Find games"):
+            if option in (OPTION_BOARD_GAME_LIBRARY, OPTION_PLAYLIST_FOR_TONIGHT) and not user_id:
+                st.warning(ERROR_INVALID_BGG_USER_ID)
+                return
+
+            st.session_state['results_option'] = option
+            st.session_state['scenario_results'] = []
+            if scenarios:
+                # Searched concurrently while rendering the right area
+                st.session_state['games_list'] = []
+                if option == OPTION_PLAYLIST_FOR_TONIGHT:
+                    user_params = {
+                        "userID": user_id,
+                        "predict_option": game_option,
+                        "ratio_filter": float(ratio_filter/100)
+                    }
+                    st.session_state['pending_scenarios'] = [
+                        (label, "predict_party", {**filter_params(details), **user_params})
+                        for label, details in scenarios
+                    ]
+                else:
+                    st.session_state['pending_scenarios'] = [
+                        (label, "predict_filters", filter_params(details))
+                        for label, details in scenarios
+                    ]
+            elif option == OPTION_BOARD_GAME_LIBRARY:
+                params = {
+                    "userID": user_id,
+                    "predict_option": game_option,
+                    # The synced collection, when there is one: the backend does not pull it again
+                    **collection_params(user_id)
+                }
+
+                st.session_state['pending_request'] = ("predict_userID", params)
+            elif option == OPTION_PLAYLIST_FOR_TONIGHT:
+                # API call to retrieve games
+                params = {
+                    **filter_params(game_details),
+                    "userID": user_id,
+                    "predict_option": game_option,
+                    "ratio_filter": float(ratio_filter/100)
+                }
+
+                st.session_state['pending_request'] = ("predict_party", params)
+            else: # "What can I offer to my nephew?"
+                # API call to retrieve games
+                params = filter_params(game_details)
+
+                st.session_state['pending_request'] = ("predict_filters", params)
+            # The results panel is a separate fragment
+            st.rerun()
+
+@st.fragment
+@metrics.timed("page_render_seconds", page="predictGames", phase="result_panel")
+def show_result_panel():
+    """
+    Right area, rerun on its own: paging, sorting and scenario clicks
+    do not rebuild the filter panel.
+    """
+    st.write(f"## {st.session_state.get('results_option', st.session_state['type_from_home'])}")
+
+    if st.session_state.get('pending_scenarios'):
+        st.session_state['scenario_results'] = run_scenarios(st.session_state.pop('pending_scenarios'))
+    elif st.session_state.get('scenario_results'):
+        show_scenario_results(st.session_state['scenario_results'])
+    elif st.session_state.get('pending_request'):
+        # The first games are previewed as soon as they are received,
+        # then replaced by the first page of the sorted results
+        endpoint, params = st.session_state.pop('pending_request')
+        preview = st.empty()
+        preview_cards = preview.container()
+        preview_size = st.session_state.get('results_page_size', PAGE_SIZES[0])
+        streamed = []
+        def on_game(game):
+            streamed.append(game)
+            if len(streamed) <= preview_size:
+                with preview_cards:
+                    show_game_card(GameResult.from_prediction(game), key_prefix="preview-")
+        with st.spinner("Searching games..."):
+            games, error = make_api_call(endpoint, params, on_game=on_game)
+        preview.empty()
+        if games and games[0].get("source") == local_catalog.LOCAL_SOURCE:
+            st.info(INFO_LOCAL_GAMES)
+        games = handle_api_response(games, error)
+        if games:
+            show_results_list(games)
+        elif not error:
+            st.info("No games to display at the moment.")
+    elif st.session_state['games_list']:
+        show_results_list(st.session_state['games_list'])
     else:
-        st.session_state['games_list'] = []
-        st.error(f"API call error: {response.status_code}")
+        st.info("No games to display at the moment.")
 
 def show_predict_games():
     #-------------------------------------------------------------------------
@@ -102,7 +503,7 @@ def show_predict_games():
     #
     #-------------------------------------------------------------------------
     # --- TOP BAR ---
-    with st.container():
+    with st.container(), metrics.timer("page_render_seconds", page="predictGames", phase="top_bar"):
         # Top Row Layout
         col1, col2, col3 = st.columns([1, 6, 1])
 
@@ -129,110 +530,11 @@ def show_predict_games():
     col1, col2 = st.columns([1, 3])
 
     with col1: # LEFT PANEL
-        choices = [OPTION_BOARD_GAME_LIBRARY, OPTION_OFFER_TO_NEPHEW, OPTION_PLAYLIST_FOR_TONIGHT]
-        option = st.segmented_control("", choices,default = st.session_state['type_from_home'], selection_mode="single")
-
-        if option == OPTION_BOARD_GAME_LIBRARY:
-            user_id, game_option = get_user_input()
-        elif option == OPTION_PLAYLIST_FOR_TONIGHT:
-            user_id, game_option = get_user_input()
-            game_details = get_game_details()
-            ratio_filter = st.slider(label="Ratio filtered games/User games (%)", min_value=10,max_value=90,value=90, step=5)
-        else: # "What can I offer to my nephew?"
-            game_details = get_game_details()
-
-        col_left, col_right = st.columns([3, 1])
-        with col_right:
-            if st.button("Find games"):
-                if option == OPTION_BOARD_GAME_LIBRARY:
-                    if user_id:
-                        params = {
-                            "userID": user_id,
-                            "predict_option": game_option
-                        }
-
-                        response = make_api_call("predict_userID", params)
-                        handle_api_response(response)
-                    else:
-                        st.session_state['games_list'] = []
-                        st.warning(ERROR_INVALID_BGG_USER_ID)
-                elif option == OPTION_PLAYLIST_FOR_TONIGHT:
-                    if user_id:
-                        # Get the cluster index from the selection
-                        selected_cluster = next(key for key, value in CLUSTER_MAP.items() if value == game_details["cluster"])
-                        # Extract average and usersrated from CLUSTER_CENTERS
-                        average, usersrated = CLUSTER_CENTERS[selected_cluster]
-
-                        # API call to retrieve games
-                        params = {
-                            "average": average,
-                            "usersrated": float(usersrated),
-                            "playingtime": PLAYING_TIME[game_details["playingtime"]],
-                            "minplayers": game_details["minplayers"],
-                            "age": AGE[game_details["age"]],
-                            "yearpublished": YEAR_PUBLISHED[game_details["yearpublished"]],
-                            "boardgamecategory": str(game_details["boardgamecategory"]),
-                            "boardgamemechanic": str(game_details["boardgamemechanic"]),
-                            "boardgamefamily": str(game_details["boardgamefamily"]),
-                            "userID": user_id,
-                            "predict_option": game_option,
-                            "ratio_filter": float(ratio_filter/100)
-                        }
-
-                        response = make_api_call("predict_party", params)
-                        handle_api_response(response)
-
-                    else:
-                        st.session_state['games_list'] = []
-                        st.warning(ERROR_INVALID_BGG_USER_ID)
-                else: # "What can I offer to my nephew?"
-                    # Get the cluster index from the selection
-                    selected_cluster = next(key for key, value in CLUSTER_MAP.items() if value == game_details["cluster"])
-                    # Extract average and usersrated from CLUSTER_CENTERS
-                    average, usersrated = CLUSTER_CENTERS[selected_cluster]
-
-                    # API call to retrieve games
-                    params = {
-                        "average": average,
-                        "usersrated": float(usersrated),
-                        "playingtime": PLAYING_TIME[game_details["playingtime"]],
-                        "minplayers": game_details["minplayers"],
-                        "age": AGE[game_details["age"]],
-                        "yearpublished": YEAR_PUBLISHED[game_details["yearpublished"]],
-                        "boardgamecategory": str(game_details["boardgamecategory"]),
-                        "boardgamemechanic": str(game_details["boardgamemechanic"]),
-                        "boardgamefamily": str(game_details["boardgamefamily"]),
-                    }
+        show_filter_panel()
 
-                    response = make_api_call("predict_filters", params)
-
-                    handle_api_response(response)
-
-        with col2: # RIGHT AREA TO DISPLAY GAMES
-            st.write(f"## {option}")
-
-            if st.session_state['games_list']:
-                for game in st.session_state['games_list']:
-                    col_img, col_details, col_button = st.columns([1, 4, 1])
-                    with col_img:
-                        if game.get('image'):
-                            st.image(game['thumbnail'], width=100)
-                        else:
-                            st.write("No image available.")
-                    with col_details:
-                        st.markdown(f"**Name:** {game.get('name', 'N/A')}")
-                        st.markdown(f"**Age:** {game.get('age', 'Not specified')}")
-                        st.markdown(f"**Description:** {game.get('description', 'No description available')[:100]}...")
-
-                        bgg_url = f"https://boardgamegeek.com/boardgame/{game.get('@objectid')}"
-
-                    with col_button :
-                        if st.button('More infos',key = game.get('@objectid')):
-                            st.session_state['current_id'] = game.get('@objectid')
-                            st.switch_page('pages/moreGameInfo.py')
-                        st.markdown(f" <a href='{bgg_url}' target='_blank'>BGG Info</a>", unsafe_allow_html=True)
-            else:
-                st.info("No games to display at the moment.")
+    with col2: # RIGHT AREA TO DISPLAY GAMES
+        show_result_panel()
 
-# if __name__ == "__main__":
-show_predict_games()
+if __name__ == "__main__":
+    with profile_rerun("predictGames"), metrics.timer("page_render_seconds", page="predictGames", phase="total"):
+        show_predict_games()
@@ -0,0 +1,52 @@
+from benchmarks.bench_bgg_parser import check_same_output, load_fixture, make_batch
+from utils.bgg_parser import INT_FIELDS, LIST_FIELDS, parse_boardgames
+
+GAME = b"""<?xml version="1.0" encoding="utf-8"?>
+<boardgames>
+    <boardgame objectid="%s">
+        <name primary="true" sortindex="1">%s</name>
+        <name sortindex="1">Other name</name>
+        <minplayers>two</minplayers>
+        <boardgamecategory objectid="1">Economic</boardgamecategory>
+        <poll name="suggested_numplayers"><results><result value="Best"/></results></poll>
+        <statistics><ratings><usersrated>12</usersrated><average>7.5</average></ratings></statistics>
+    </boardgame>
+</boardgames>"""
+
+
+def test_fixture_record():
+    game, = parse_boardgames(load_fixture())
+    assert game["@objectid"] == "224517"
+    assert game["main_name"] == "Brass: Birmingham"
+    assert game["main_name"] in game["name"]
+    assert (game["yearpublished"], game["minplayers"], game["maxplayers"], game["age"]) == (2018, 2, 4, 14)
+    assert game["usersrated"] == 49875
+    assert game["average"] == 8.57193
+    assert game["averageweight"] == 3.8661
+    assert "Economic" in game["boardgamecategory"]
+
+def test_same_output_as_legacy_parser():
+    check_same_output(load_fixture())
+
+def test_batch_keeps_order():
+    games = parse_boardgames(make_batch(load_fixture(), size=5))
+    assert [game["@objectid"] for game in games] == [str(224517 + i) for i in range(5)]
+    assert all(game["main_name"] == "Brass: Birmingham" for game in games)
+
+def test_missing_and_invalid_values():
+    game, = parse_boardgames(GAME % (b"42", b"Tiny Game"))
+    assert game["minplayers"] == ""
+    assert all(game[field] == "" for field in INT_FIELDS if field not in ("usersrated", "minplayers"))
+    assert game["usersrated"] == 12
+    assert game["average"] == 7.5
+    assert game["averageweight"] == ""
+    assert game["name"] == ["Tiny Game", "Other name"]
+    assert all(game[field] == [] for field in LIST_FIELDS if field not in ("name", "boardgamecategory"))
+
+def test_games_with_an_error_are_skipped():
+    content = b"""<boardgames>
+        <boardgame objectid="1"><error message="Item not found"/></boardgame>
+        <boardgame objectid="2"><name primary="true">Found</name></boardgame>
+    </boardgames>"""
+    games = parse_boardgames(content)
+    assert [(game["@objectid"], game["main_name"]) for game in games] == [("2", "Found")]
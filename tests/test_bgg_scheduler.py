@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from utils import bgg_scheduler, http_client
+from utils.bgg_scheduler import BggScheduler
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+class Client:
+    """Answers the statuses in turn, an exception instance is raised."""
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def get(self, url, params=None, max_retries=None):
+        self.calls.append(max_retries)
+        answer = self.answers[min(len(self.calls), len(self.answers)) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return Response(answer)
+
+class Bucket:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "backoff_delay", lambda attempt, response=None: 0)
+
+def scheduler(client):
+    scheduler = BggScheduler(client=client)
+    scheduler.bucket = Bucket()
+    return scheduler
+
+
+def test_every_attempt_takes_a_token():
+    client = Client(requests.ConnectionError("reset"), 429, 503, 200)
+    bgg = scheduler(client)
+    assert bgg.fetch("http://bgg/thing", timeout=5).status_code == 200
+    assert client.calls == [0, 0, 0, 0]  # no retry inside the HTTP client
+    assert bgg.bucket.tokens == 4
+    assert (bgg.metrics()["retried"], bgg.metrics()["completed"]) == (3, 1)
+
+def test_retries_are_bounded():
+    client = Client(429)
+    bgg = scheduler(client)
+    assert bgg.fetch("http://bgg/thing", timeout=5).status_code == 429
+    assert len(client.calls) == bgg_scheduler.MAX_RETRIES + 1
+
+def test_connection_error_raised_after_retries():
+    client = Client(requests.ConnectionError("down"))
+    bgg = scheduler(client)
+    with pytest.raises(requests.ConnectionError):
+        bgg.fetch("http://bgg/thing", timeout=5)
+    assert bgg.metrics()["failed"] == 1
+
+def test_retry_statuses_per_request():
+    client = Client(202, 200)
+    bgg = scheduler(client)
+    retry_statuses = http_client.RETRY_STATUSES - {202}
+    assert bgg.fetch("http://bgg/collection", timeout=5, retry_statuses=retry_statuses).status_code == 202
+    assert len(client.calls) == 1
+
+class BlockingClient(Client):
+    """Holds the first call until released, records the URLs in call order."""
+    def __init__(self):
+        super().__init__(200)
+        self.urls = []
+        self.first_call = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, url, params=None, max_retries=None):
+        self.urls.append(url)
+        self.first_call.set()
+        self.release.wait(5)
+        return super().get(url, params, max_retries)
+
+def test_interactive_goes_ahead_of_queued_prefetches():
+    client = BlockingClient()
+    bgg = BggScheduler(workers=1, client=client)
+    bgg.bucket = Bucket()
+    futures = [bgg.submit("http://bgg/prefetch/0", priority=bgg_scheduler.PRIORITY_PREFETCH)]
+    client.first_call.wait(5)  # the only worker is busy
+    futures += [bgg.submit(f"http://bgg/prefetch/{i}", priority=bgg_scheduler.PRIORITY_PREFETCH) for i in (1, 2, 3)]
+    futures.append(bgg.submit("http://bgg/interactive", priority=bgg_scheduler.PRIORITY_INTERACTIVE))
+    assert bgg.queue_depth() == {"interactive": 1, "prefetch": 3, "banner": 0}
+    assert bgg.metrics()["in_flight"] == 1
+
+    client.release.set()
+    for future in futures:
+        future.result(5)
+    assert client.urls == ["http://bgg/prefetch/0", "http://bgg/interactive",
+                           "http://bgg/prefetch/1", "http://bgg/prefetch/2", "http://bgg/prefetch/3"]
+    assert bgg.queue_depth() == {"interactive": 0, "prefetch": 0, "banner": 0}
+
+def test_priority_bump_does_not_burn_tokens():
+    client = BlockingClient()
+    bgg = BggScheduler(workers=1, client=client)
+    bgg.bucket = Bucket()
+    first = bgg.submit("http://bgg/busy")
+    client.first_call.wait(5)
+    queued = bgg.submit("http://bgg/thing", priority=bgg_scheduler.PRIORITY_BANNER)
+    assert bgg.submit("http://bgg/thing", priority=bgg_scheduler.PRIORITY_INTERACTIVE) is queued
+    client.release.set()
+    first.result(5)
+    queued.result(5)
+    time.sleep(0.05)  # the dispatcher is back waiting for a job
+    assert client.urls == ["http://bgg/busy", "http://bgg/thing"]
+    assert bgg.bucket.tokens == 2
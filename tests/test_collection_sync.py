@@ -0,0 +1,100 @@
+import pytest
+
+from utils import collection_sync, game_cache
+from utils.collection_sync import (CollectionQueued, CollectionSync, collection_params, collection_token,
+                                   parse_collection)
+from utils.filter_encoding import decode_codes
+
+
+def collection_xml(*items):
+    """items: (game ID, own, rating value)"""
+    return ("<items>" + "".join(
+        f'<item objectid="{game_id}"><stats><rating value="{rating}"/></stats><status own="{own}"/></item>'
+        for game_id, own, rating in items
+    ) + "</items>").encode("utf-8")
+
+class Response:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def sync(monkeypatch):
+    monkeypatch.setattr(game_cache, "_backend", game_cache.MemoryBackend())
+    monkeypatch.setattr(game_cache, "_caches", {})
+    monkeypatch.setattr(collection_sync, "QUEUED_DELAY", 0)
+    return CollectionSync(workers=1)
+
+def serve(monkeypatch, *responses):
+    """BGG answers the responses in turn, returns the requests sent."""
+    requests = []
+    def fetch(url, params=None, priority=None, retry_statuses=None):
+        requests.append((dict(params), retry_statuses))
+        return responses[len(requests) - 1]
+    monkeypatch.setattr(collection_sync.bgg_scheduler, "fetch", fetch)
+    return requests
+
+
+def test_parse_collection():
+    items = parse_collection(collection_xml(("1", 1, "7.5"), ("2", 0, "N/A"), ("2", 1, "N/A"), ("3", 0, "8")))
+    assert items == {"1": [1, 7.5], "2": [1, None], "3": [0, 8.0]}
+
+def test_parse_collection_error():
+    with pytest.raises(ValueError, match="Invalid username"):
+        parse_collection(b"<errors><error><message>Invalid username specified</message></error></errors>")
+
+def test_token_follows_the_content():
+    items = {"1": [1, 7.5], "2": [0, None]}
+    assert collection_token(items) == collection_token(dict(reversed(items.items())))
+    assert collection_token(items) != collection_token({"1": [0, 7.5], "2": [0, None]})
+    assert collection_token(items) != collection_token({"1": [1, 8.0], "2": [0, None]})
+
+def test_full_then_incremental_sync(sync, monkeypatch):
+    requests = serve(monkeypatch,
+                     Response(200, collection_xml(("1", 1, "N/A"), ("2", 0, "6"))),
+                     Response(200, collection_xml(("2", 1, "9"), ("3", 0, "N/A"))))
+    first = sync.sync("Alice")
+    assert first["items"] == {"1": [1, None], "2": [0, 6.0]}
+    assert "modifiedsince" not in requests[0][0]
+
+    second = sync.sync("alice ")  # user names are case-insensitive
+    assert "modifiedsince" in requests[1][0]
+    assert second["items"] == {"1": [1, None], "2": [1, 9.0], "3": [0, None]}
+    assert second["token"] != first["token"]
+    assert second["full_synced_at"] == first["full_synced_at"]
+    assert sync.get("ALICE") == second
+    assert (sync.stats["full_syncs"], sync.stats["incremental_syncs"]) == (1, 1)
+
+def test_full_sync_after_interval(sync, monkeypatch):
+    serve(monkeypatch, Response(200, collection_xml(("1", 1, "N/A"))), Response(200, collection_xml(("2", 1, "N/A"))))
+    sync.sync("bob")
+    monkeypatch.setattr(collection_sync, "FULL_SYNC_INTERVAL", -1)
+    assert sync.sync("bob")["items"] == {"2": [1, None]}  # removed games disappear
+
+def test_queued_collection_is_polled(sync, monkeypatch):
+    requests = serve(monkeypatch, Response(202), Response(202), Response(200, collection_xml(("1", 1, "N/A"))))
+    assert sync.sync("carol")["items"] == {"1": [1, None]}
+    assert sync.stats["queued_answers"] == 2
+    assert all(202 not in retry_statuses for _, retry_statuses in requests)
+
+def test_queued_for_too_long(sync, monkeypatch):
+    serve(monkeypatch, *[Response(202)] * collection_sync.QUEUED_POLLS)
+    with pytest.raises(CollectionQueued):
+        sync.sync("dave")
+
+def test_collection_params(sync, monkeypatch):
+    serve(monkeypatch, Response(200, collection_xml(("10", 1, "7.5"), ("3", 0, "N/A"), ("5", 0, "8"), ("20", 1, "N/A"))))
+    monkeypatch.setattr(collection_sync, "_collection_sync", sync)
+    monkeypatch.setattr(sync, "sync_in_background", lambda user_id: None)
+    assert collection_params("erin", mode="local") == {}  # not synced yet
+    assert collection_params("erin", mode="backend") == {}
+
+    collection = sync.sync("erin")
+    params = collection_params("erin", mode="local")
+    assert params["collection_token"] == collection["token"]
+    assert decode_codes(params["collection_owned"]) == [10, 20]
+    assert decode_codes(params["collection_rated"]) == [5, 10]
+    assert params["collection_ratings"] == "8,7.5"
@@ -0,0 +1,61 @@
+import pytest
+
+from utils.filter_encoding import (FILTER_ENCODING_VERSION, FILTER_FIELDS, decode_codes, decode_filters,
+                                   encode_codes, encode_filters, use_post)
+from utils.taxonomy import load_taxonomy_index
+
+
+@pytest.mark.parametrize("codes", [
+    [],
+    [0],
+    [35, 36, 1295, 1296],
+    list(range(0, 5000, 7)),  # dense: bitset
+    [3, 100_000],  # sparse: delta list
+])
+def test_codes_round_trip(codes):
+    assert decode_codes(encode_codes(codes)) == codes
+
+def test_codes_are_sorted_and_deduplicated():
+    assert decode_codes(encode_codes([9, 2, 9, 5])) == [2, 5, 9]
+
+def test_shortest_form_is_used():
+    assert encode_codes(range(0, 5000, 7)).startswith(f"{FILTER_ENCODING_VERSION}.b.")
+    assert encode_codes([3, 100_000]).startswith(f"{FILTER_ENCODING_VERSION}.d.")
+
+def test_unknown_version_or_kind():
+    with pytest.raises(ValueError):
+        decode_codes(f"{FILTER_ENCODING_VERSION + 1}.d.1")
+    with pytest.raises(ValueError):
+        decode_codes(f"{FILTER_ENCODING_VERSION}.x.1")
+
+def selection():
+    taxonomy = load_taxonomy_index()
+    return {field: taxonomy[vocabulary].labels[:3] for field, vocabulary in FILTER_FIELDS.items()}
+
+def expected_codes(game_details):
+    taxonomy = load_taxonomy_index()
+    return {field: sorted(taxonomy[vocabulary].code_of(label) for label in game_details[field])
+            for field, vocabulary in FILTER_FIELDS.items()}
+
+@pytest.mark.parametrize("encoding", ["legacy", "compact"])
+def test_filters_round_trip(encoding):
+    game_details = selection()
+    decoded = decode_filters(encode_filters(game_details, encoding))
+    assert {field: sorted(codes) for field, codes in decoded.items()} == expected_codes(game_details)
+
+def test_legacy_filters_drop_unknown_labels():
+    game_details = selection()
+    game_details["boardgamecategory"] = game_details["boardgamecategory"] + ["Not a category"]
+    decoded = decode_filters(encode_filters(game_details, "legacy"))
+    assert sorted(decoded["boardgamecategory"]) == expected_codes(selection())["boardgamecategory"]
+
+def test_missing_filters_decode_empty():
+    assert decode_filters({}) == {field: [] for field in FILTER_FIELDS}
+    assert decode_filters({"boardgamecategory": float("nan")})["boardgamecategory"] == []
+
+def test_use_post():
+    long_params = {"boardgamefamily": "x" * 3000}
+    assert not use_post("http://api/predict_filters", long_params, encoding="legacy")
+    assert use_post("http://api/predict_filters", long_params, encoding="compact")
+    assert not use_post("http://api/predict_filters", {"boardgamefamily": "x"}, encoding="compact")
+    assert use_post("http://api/predict_userID", dict(long_params, collection_token="t"), encoding="legacy")
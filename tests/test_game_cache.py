@@ -0,0 +1,89 @@
+import pytest
+
+from utils import game_cache
+from utils.game_cache import CacheBackend, GameCache, MemoryBackend, SQLiteBackend, get_game_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(game_cache.time, "time", clock)
+    return clock
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=3)
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries=3)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+def test_round_trip(backend):
+    cache = GameCache(backend)
+    cache.set_many({"1": {"main_name": "Catan"}, 2: {"main_name": "Azul"}})
+    assert cache.get_many(["1", "2", "3"]) == {"1": {"main_name": "Catan"}, "2": {"main_name": "Azul"}}
+    assert cache.get(2) == {"main_name": "Azul"}
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+def test_namespaces_do_not_collide(backend):
+    GameCache(backend, namespace="thing").set("1", "thing")
+    GameCache(backend, namespace="boardgame").set("1", "boardgame")
+    assert GameCache(backend, namespace="thing").get("1") == "thing"
+
+def test_ttl_expiry(backend, clock):
+    cache = GameCache(backend, ttl=60)
+    cache.set("1", "default ttl")
+    cache.set("2", "own ttl", ttl=120)
+    clock.now += 61
+    assert cache.get_many(["1", "2"]) == {"2": "own ttl"}
+    assert len(backend) == 1  # expired entries are deleted when read
+    clock.now += 60
+    assert cache.get("2") is None
+
+def test_background_lookups_are_not_counted(backend):
+    cache = GameCache(backend)
+    cache.get("1", count_stats=False)
+    assert cache.stats()["misses"] == 0
+
+def test_lru_eviction(backend, clock):
+    cache = GameCache(backend)
+    for game_id in "123":
+        clock.now += 1
+        cache.set(game_id, game_id)
+    clock.now += 1
+    cache.get("1")  # recently used
+    clock.now += 1
+    cache.set("4", "4")
+    assert len(backend) == 3
+    assert cache.get_many("1234") == {"1": "1", "3": "3", "4": "4"}
+
+def test_sqlite_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    GameCache(SQLiteBackend(path)).set("224517", {"main_name": "Brass: Birmingham"})
+    assert GameCache(SQLiteBackend(path)).get("224517") == {"main_name": "Brass: Birmingham"}
+
+def test_clear(backend):
+    cache = GameCache(backend)
+    cache.set("1", "1")
+    backend.clear()
+    assert len(backend) == 0
+
+def test_one_ttl_per_namespace(monkeypatch):
+    monkeypatch.setattr(game_cache, "_backend", MemoryBackend())
+    monkeypatch.setattr(game_cache, "_caches", {})
+    cache = get_game_cache("hot", ttl=60)
+    assert get_game_cache("hot", ttl=60) is cache
+    with pytest.raises(ValueError):
+        get_game_cache("hot", ttl=120)
+    assert game_cache.get_game_caches() == {"hot": cache}
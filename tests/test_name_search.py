@@ -0,0 +1,55 @@
+import numpy as np
+
+from benchmarks.bench_local_scorer import synthetic_catalog
+from utils.local_catalog import GameCatalog
+from utils.name_search import NameIndex, normalize, word_starts
+
+
+def name_index(games):
+    """NameIndex of games given as (name, alternate names, usersrated), IDs from 1."""
+    frame = synthetic_catalog(len(games))
+    frame["name"] = [name for name, _, _ in games]
+    frame["alternate_names"] = [alternates for _, alternates, _ in games]
+    frame["usersrated"] = np.array([usersrated for _, _, usersrated in games], np.float32)
+    return NameIndex(GameCatalog(frame))
+
+def names(results):
+    return [name for _, name in results]
+
+
+def test_normalize():
+    assert normalize("Les Aventuriers du Rail : Europe") == "les aventuriers du rail europe"
+    assert normalize("Château  FORÊT!") == "chateau foret"
+    assert word_starts("les aventuriers du rail") == ["aventuriers du rail", "du rail", "rail"]
+
+def test_primary_then_alternate_then_word():
+    index = name_index([
+        ("Ticket to Ride", ["Les Aventuriers du Rail"], 100),
+        ("Rail Baron", [], 10),
+        ("Railroad Ink", [], 50),
+        ("Aventuriers", [], 1),
+    ])
+    assert names(index.search("rail")) == ["Railroad Ink", "Rail Baron", "Ticket to Ride"]
+    assert names(index.search("aventu")) == ["Aventuriers", "Ticket to Ride"]
+    assert names(index.search("ride")) == ["Ticket to Ride"]
+
+def test_most_rated_first_over_the_whole_range():
+    games = [(f"Ca{i:04d} Game", [], 10) for i in range(600)] + [("Catan", [], 100_000)]
+    index = name_index(games)
+    assert index.search("ca")[0] == ("601", "Catan")
+    assert len(index.search("ca")) == 10
+
+def test_one_result_per_game():
+    index = name_index([("Catan Catan", ["Catan"], 10), ("Catacombs", [], 1)])
+    assert names(index.search("cata")) == ["Catan Catan", "Catacombs"]
+
+def test_accents_case_and_short_queries():
+    index = name_index([("Château Forêt", [], 10), ("Chess", [], 1)])
+    assert names(index.search("CHATEAU")) == ["Château Forêt"]
+    assert names(index.search("forê")) == ["Château Forêt"]
+    assert index.search("c") == []
+    assert index.search("zz") == []
+
+def test_limit():
+    index = name_index([(f"Dragon {i}", [], i) for i in range(30)])
+    assert names(index.search("dragon", limit=3)) == ["Dragon 29", "Dragon 28", "Dragon 27"]
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from utils import predict_cache
+from utils.predict_cache import COLLECTION_TOKEN_TTL, PredictCache, canonical_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(predict_cache.time, "time", clock)
+    return clock
+
+def counting_call(value=("game",), error=None):
+    calls = []
+    def call():
+        calls.append(1)
+        return list(value), error
+    return call, calls
+
+
+def test_canonical_key():
+    assert canonical_key("predict_filters", {"b": 1.0000001, "a": float("nan")}) == \
+        canonical_key("predict_filters", {"a": None, "b": 1.0})
+
+def test_hit_until_ttl(clock):
+    cache = PredictCache(ttls={"predict_party": 60})
+    call, calls = counting_call()
+    assert cache.fetch("predict_party", {"x": 1}, call) == (["game"], None)
+    clock.now += 59
+    assert cache.fetch("predict_party", {"x": 1}, call) == (["game"], None)
+    assert len(calls) == 1
+    clock.now += 2
+    cache.fetch("predict_party", {"x": 1}, call)
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+
+def test_collection_token_keeps_results_longer(clock):
+    cache = PredictCache(ttls={"predict_userID": 60})
+    assert cache.ttl("predict_userID", {}) == 60
+    assert cache.ttl("predict_userID", {"collection_token": "t"}) == COLLECTION_TOKEN_TTL
+    call, calls = counting_call()
+    cache.fetch("predict_userID", {"collection_token": "t"}, call)
+    clock.now += 61
+    cache.fetch("predict_userID", {"collection_token": "t"}, call)
+    assert len(calls) == 1
+
+def test_errors_are_not_cached(clock):
+    cache = PredictCache()
+    call, calls = counting_call(value=(), error="API call error: 500")
+    assert cache.fetch("predict_filters", {}, call) == ([], "API call error: 500")
+    cache.fetch("predict_filters", {}, call)
+    assert len(calls) == 2
+
+def test_lru_size_bound(clock):
+    cache = PredictCache(max_bytes=60)
+    for i in range(5):
+        cache.fetch("predict_filters", {"i": i}, lambda: (["x" * 20], None))
+    assert cache.stats()["bytes"] <= 60
+    assert cache.stats()["entries"] < 5
+
+def test_single_flight():
+    cache = PredictCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    def slow_call():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ["game"], None
+
+    results = []
+    def fetch():
+        results.append(cache.fetch("predict_filters", {"x": 1}, slow_call))
+    leader = threading.Thread(target=fetch)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=fetch) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [(["game"], None)] * 4
+    assert cache.stats()["coalesced"] == 3
+
+def test_single_flight_exception_reaches_every_waiter():
+    cache = PredictCache()
+    started, release = threading.Event(), threading.Event()
+    def failing_call():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("backend down")
+
+    errors = []
+    def fetch():
+        try:
+            cache.fetch("predict_filters", {}, failing_call)
+        except RuntimeError as e:
+            errors.append(str(e))
+    leader = threading.Thread(target=fetch)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=fetch)
+    follower.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["backend down"] * 2
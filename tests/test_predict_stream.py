@@ -0,0 +1,105 @@
+import json
+
+import pytest
+import requests
+
+from pages.predictGames import ERROR_API_RESPONSE_FORMAT, ERROR_BACKEND_UNAVAILABLE, read_predictions
+from utils.predict_stream import iter_json_array, iter_predictions
+
+GAMES = [
+    {"@objectid": "1", "name": "Catan", "average": 7.1, "age": 10},
+    {"@objectid": "2", "name": 'Quote " and \\ backslash, [brackets] {braces}', "tags": ["a", "b"]},
+    {"@objectid": "3", "name": "Les Aventuriers du Rail éè – \U0001f3b2", "description": "line\nbreak"},
+]
+TEXT = json.dumps(GAMES, ensure_ascii=False, indent=1)
+
+
+class Response:
+    """Streamed response sending body in chunks, then raising error if any."""
+    def __init__(self, body, chunk_size=8192, content_type="application/json", status_code=200, error=None):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.headers = {"Content-Type": content_type}
+        self.encoding = "utf-8"
+        self.status_code = status_code
+        self.error = error
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+        if self.error:
+            raise self.error
+
+    def iter_lines(self):
+        yield from self.body.splitlines()
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+def chunks(text, size):
+    return (text[start:start + size] for start in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("size", range(1, 40))
+def test_array_split_at_every_chunk_size(size):
+    assert list(iter_json_array(chunks(TEXT, size))) == GAMES
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_bytes_split_inside_multibyte_characters(size):
+    response = Response(TEXT.encode("utf-8"), chunk_size=size)
+    assert list(iter_predictions(response)) == GAMES
+
+@pytest.mark.parametrize("size", range(1, 8))
+def test_numbers_are_not_cut_at_chunk_boundaries(size):
+    assert list(iter_json_array(chunks("[12345, -6.5e3, 7, true, null]", size))) == [12345, -6.5e3, 7, True, None]
+
+@pytest.mark.parametrize("text", ["[]", " [ ] ", "[\n]"])
+def test_empty_array(text):
+    assert list(iter_json_array(chunks(text, 1))) == []
+
+def test_ndjson():
+    body = "".join(json.dumps(game) + "\n" for game in GAMES).encode("utf-8") + b"\n"
+    response = Response(body, content_type="application/x-ndjson; charset=utf-8")
+    assert list(iter_predictions(response)) == GAMES
+
+@pytest.mark.parametrize("text", ['[{"a": 1}', '[{"a": 1}, {"b": "unterminated', ""])
+def test_truncated_array(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunks(text, 3)))
+
+def test_not_an_array():
+    with pytest.raises(ValueError):
+        list(iter_json_array(['{"games": []}']))
+
+def test_read_predictions():
+    games, error = read_predictions(Response(TEXT.encode("utf-8"), chunk_size=10))
+    assert (games, error) == (GAMES, None)
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError("connection broken"),
+                                   requests.ConnectionError("reset by peer")])
+def test_connection_lost_mid_stream(error):
+    body = TEXT.encode("utf-8")
+    response = Response(body[:len(body) // 2], chunk_size=16, error=error)
+    games, message = read_predictions(response)
+    assert message == ERROR_BACKEND_UNAVAILABLE
+    assert games == GAMES[:len(games)] and len(games) < len(GAMES)
+    assert response.closed
+
+def test_ndjson_connection_lost_keeps_received_games():
+    body = "".join(json.dumps(game) + "\n" for game in GAMES[:2]).encode("utf-8")
+    response = Response(body, content_type="application/x-ndjson", error=requests.ConnectionError("reset"))
+    assert read_predictions(response) == (GAMES[:2], ERROR_BACKEND_UNAVAILABLE)
+
+def test_truncated_response_is_a_format_error():
+    response = Response(TEXT.encode("utf-8")[:-5])
+    games, message = read_predictions(response)
+    assert message == ERROR_API_RESPONSE_FORMAT
+    assert games == GAMES[:2]
+
+def test_http_error():
+    response = Response(b"", status_code=503)
+    assert read_predictions(response) == ([], "API call error: 503")
+    assert response.closed
@@ -0,0 +1,51 @@
+"""
+Batched lookup of BGG game records.
+
+Game IDs are read from the shared game cache first. The missing ones are
+requested from the legacy `xmlapi/boardgame` endpoint, which accepts a
+comma-separated list, BGG_MAX_BATCH_SIZE IDs per request.
+"""
+import logging
+
+from constant.params import BGG_BOARDGAME_URL, BGG_MAX_BATCH_SIZE
+from utils import bgg_scheduler
+from utils.bgg_parser import parse_boardgames
+from utils.game_cache import get_game_cache
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_games(game_ids, priority=bgg_scheduler.PRIORITY_INTERACTIVE, batch_size=BGG_MAX_BATCH_SIZE,
+                count_stats=True):
+    '''
+    Retrieve games information from a list of game IDs.
+    - Reads through the shared game cache (count_stats as in GameCache.get_many)
+    - Requests BGG API for the missing IDs, batch_size IDs per call
+    - Returns a dict {game_id: game record}, in the order of game_ids,
+      without the games BGG could not return
+    '''
+    game_ids = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+    cache = get_game_cache("boardgame")
+    games = cache.get_many(game_ids, count_stats)
+    missing_ids = [game_id for game_id in game_ids if game_id not in games]
+
+    # All batches are queued at once, the scheduler paces them
+    batches = [missing_ids[i:i + batch_size] for i in range(0, len(missing_ids), batch_size)]
+    futures = [
+        bgg_scheduler.get_scheduler().submit(BGG_BOARDGAME_URL + ",".join(batch), params={"stats": 1}, priority=priority)
+        for batch in batches
+    ]
+    for batch, future in zip(batches, futures):
+        try:
+            response = future.result(timeout=bgg_scheduler.WAIT_TIMEOUT)
+        except Exception as e:
+            logger.warning("BGG request failed for %s: %s", batch, e)
+            continue
+        if response.status_code != 200:
+            logger.warning("BGG request failed for %s with status code %s", batch, response.status_code)
+            continue
+        for game in parse_boardgames(response.content):
+            cache.set(game['@objectid'], game)
+            games[game['@objectid']] = game
+
+    return {game_id: games[game_id] for game_id in game_ids if game_id in games}
@@ -0,0 +1,76 @@
+"""
+Single-pass parser for BGG legacy `xmlapi/boardgame` responses.
+
+Builds the normalized game records shown on the game page directly from
+ElementTree's iterparse events, instead of converting the whole document
+into nested dicts first. Elements we never display (polls, versions,
+expansions, ...) are dropped as soon as they are closed.
+
+Each record is a flat dict:
+- '@objectid', 'description', 'thumbnail', 'image', 'main_name': str
+- INT_FIELDS: int ('' when missing)
+- 'average', 'averageweight': float ('' when missing)
+- LIST_FIELDS (including 'name'): list of str
+"""
+import io
+import xml.etree.ElementTree as ET
+
+from utils.metrics import timed
+
+INT_FIELDS = ('yearpublished', 'minplayers', 'maxplayers',
+              'playingtime', 'minplaytime', 'maxplaytime', 'age',
+              'usersrated')  # usersrated is inside statistics/ratings
+TEXT_FIELDS = ('description', 'thumbnail', 'image')
+FLOAT_FIELDS = ('average', 'averageweight')  # inside statistics/ratings
+LIST_FIELDS = ('name',
+               'boardgamepublisher', 'boardgamedesigner', 'boardgameartist',
+               'boardgamehonor', 'boardgamecategory',
+               'boardgamefamily', 'boardgamemechanic', 'boardgamesubdomain')
+
+
+def _new_record():
+    record = {'@objectid': '', 'main_name': ''}
+    record.update({field: '' for field in INT_FIELDS + TEXT_FIELDS + FLOAT_FIELDS})
+    record.update({field: [] for field in LIST_FIELDS})
+    return record
+
+def _to_number(text, cast):
+    try:
+        return cast(text)
+    except (TypeError, ValueError):
+        return ''
+
+@timed("xml_parse_seconds", document="boardgame")
+def parse_boardgames(content):
+    '''
+    Parse a legacy BGG boardgame response.
+    - Takes the raw XML bytes (one or several <boardgame> elements)
+    - Skips games BGG answered with an <error>
+    - Returns data as a list of game records
+    '''
+    records = []
+    record = _new_record()
+    failed = False
+    for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+        tag = elem.tag
+        if tag in LIST_FIELDS:
+            text = elem.text or ''
+            record[tag].append(text)
+            if tag == 'name' and elem.get('primary'):
+                record['main_name'] = text
+        elif tag in INT_FIELDS:
+            record[tag] = _to_number(elem.text, int)
+        elif tag in FLOAT_FIELDS:
+            record[tag] = _to_number(elem.text, float)
+        elif tag in TEXT_FIELDS:
+            record[tag] = elem.text or ''
+        elif tag == 'error':
+            failed = True
+        elif tag == 'boardgame':
+            if not failed:
+                record['@objectid'] = elem.get('objectid', '')
+                records.append(record)
+            record = _new_record()
+            failed = False
+        elem.clear()
+    return records
@@ -0,0 +1,251 @@
+"""
+Process-wide scheduler in front of all BoardGameGeek traffic.
+
+- A token bucket keeps the whole process under BGG's rate limit
+- Pending requests are served by priority class (see PRIORITY_*)
+- Concurrent requests for the same URL share one call (single-flight)
+- Transient failures (connection errors, 202/429/5xx by default) are
+  retried by the scheduler, not the HTTP client: every attempt waits for its
+  own token
+- Queue depth and wait times are exposed through `metrics()`
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import requests
+
+from utils import http_client
+
+PRIORITY_INTERACTIVE = 0  # "More infos" lookups, a user is waiting
+PRIORITY_PREFETCH = 1  # background prefetch of predicted games
+PRIORITY_BANNER = 2  # hot games banner refresh
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_PREFETCH: "prefetch",
+    PRIORITY_BANNER: "banner",
+}
+
+RATE_LIMIT = float(os.environ.get("BGG_RATE_LIMIT", 2.0))  # requests per second
+BURST = int(os.environ.get("BGG_BURST", 5))
+WORKERS = 4
+WAIT_TIMEOUT = 60  # seconds a caller waits for its response
+MAX_RETRIES = http_client.MAX_RETRIES
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity`."""
+    def __init__(self, rate=RATE_LIMIT, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                missing = (1 - self.tokens) / self.rate
+            time.sleep(missing)
+
+
+class _Job:
+    def __init__(self, key, url, params, priority, retry_statuses):
+        self.key = key
+        self.url = url
+        self.params = params
+        self.priority = priority
+        self.retry_statuses = retry_statuses
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.queued = True  # has a live entry in the heap
+        self.started = False  # running on a worker
+        self.attempts = 0
+
+
+class BggScheduler:
+    """
+    Priority queue of BGG requests drained at the token bucket's pace.
+    A dispatcher thread waits for a free worker and a token, then starts the
+    most urgent pending request: requests wait in the priority heap, never
+    in the worker pool's FIFO queue, so a slow answer never holds the queue
+    and an interactive request goes ahead of queued prefetches.
+    Heap entries left behind by a priority bump are stale and skipped.
+    """
+    def __init__(self, rate=RATE_LIMIT, burst=BURST, workers=WORKERS, client=None):
+        self.bucket = TokenBucket(rate, burst)
+        self.client = client or http_client.get_client()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bgg")
+        self._free_workers = threading.BoundedSemaphore(workers)
+        self._heap = []
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._dispatcher = None
+        self._metrics = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "wait": {name: {"count": 0, "total": 0.0, "max": 0.0} for name in PRIORITY_NAMES.values()},
+        }
+
+    def submit(self, url, params=None, priority=PRIORITY_INTERACTIVE, retry_statuses=http_client.RETRY_STATUSES):
+        """
+        Queues a GET request and returns a Future of its response.
+        - retry_statuses: answers retried before the response is returned
+        """
+        key = requests.Request("GET", url, params=params).prepare().url
+        key = (key, frozenset(retry_statuses))
+        with self._cond:
+            self._metrics["submitted"] += 1
+            job = self._jobs.get(key)
+            if job is not None:
+                self._metrics["deduplicated"] += 1
+                if priority < job.priority and not job.started:
+                    # A more urgent caller joined, move the request up the queue
+                    job.priority = priority
+                    if job.queued:
+                        heapq.heappush(self._heap, (priority, next(self._counter), job))
+                return job.future
+            job = _Job(key, url, params, priority, retry_statuses)
+            self._jobs[key] = job
+            heapq.heappush(self._heap, (priority, next(self._counter), job))
+            self._start_dispatcher()
+            self._cond.notify()
+        return job.future
+
+    def fetch(self, url, params=None, priority=PRIORITY_INTERACTIVE, timeout=WAIT_TIMEOUT,
+              retry_statuses=http_client.RETRY_STATUSES):
+        """Queues a GET request and waits for its response."""
+        future = self.submit(url, params=params, priority=priority, retry_statuses=retry_statuses)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise requests.Timeout(f"BGG request still queued after {timeout}s: {url}")
+
+    def queue_depth(self):
+        """Returns the number of queued requests per priority class."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for job in self._jobs.values():
+                if job.queued:
+                    depth[PRIORITY_NAMES[job.priority]] += 1
+            return depth
+
+    def metrics(self):
+        with self._cond:
+            wait = {
+                name: dict(stats, avg=stats["total"] / stats["count"] if stats["count"] else 0.0)
+                for name, stats in self._metrics["wait"].items()
+            }
+            in_flight = sum(job.started for job in self._jobs.values())
+            metrics = dict(self._metrics, wait=wait, in_flight=in_flight)
+        metrics["queue_depth"] = self.queue_depth()
+        return metrics
+
+    def _start_dispatcher(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name="bgg-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _drop_stale(self):
+        while self._heap and (not self._heap[0][2].queued or self._heap[0][0] != self._heap[0][2].priority):
+            heapq.heappop(self._heap)
+
+    def _dispatch(self):
+        while True:
+            # The job is only chosen once it can start, released by _run
+            self._free_workers.acquire()
+            with self._cond:
+                self._drop_stale()
+                while not self._heap:
+                    self._cond.wait()
+                    self._drop_stale()
+            self.bucket.acquire()
+            with self._cond:
+                # Only this thread pops: the heap still has a live entry, maybe a more urgent one
+                self._drop_stale()
+                _, _, job = heapq.heappop(self._heap)
+                job.queued = False
+                if not job.attempts:
+                    waited = time.monotonic() - job.submitted_at
+                    stats = self._metrics["wait"][PRIORITY_NAMES[job.priority]]
+                    stats["count"] += 1
+                    stats["total"] += waited
+                    stats["max"] = max(stats["max"], waited)
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        with self._cond:
+            job.started = True
+        response, error = None, None
+        try:
+            response = self.client.get(job.url, params=job.params, max_retries=0)
+        except requests.ConnectionError as e:
+            error = e
+        except Exception as e:
+            self._finish(job, "failed", error=e)
+            return
+        transient = response is None or response.status_code in job.retry_statuses
+        if transient and job.attempts < MAX_RETRIES:
+            if response is not None:
+                response.close()
+            delay = http_client.backoff_delay(job.attempts, response)
+            job.attempts += 1
+            with self._cond:
+                job.started = False
+                self._metrics["retried"] += 1
+            self._free_workers.release()
+            # Back in the queue after the backoff, behind a token like any request
+            timer = threading.Timer(delay, self._requeue, (job,))
+            timer.daemon = True
+            timer.start()
+        elif response is None:
+            self._finish(job, "failed", error=error)
+        else:
+            self._finish(job, "completed", response=response)
+
+    def _requeue(self, job):
+        with self._cond:
+            job.queued = True
+            heapq.heappush(self._heap, (job.priority, next(self._counter), job))
+            self._cond.notify()
+
+    def _finish(self, job, outcome, response=None, error=None):
+        with self._cond:
+            self._jobs.pop(job.key, None)
+            self._metrics[outcome] += 1
+        self._free_workers.release()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(response)
+
+
+_scheduler = None
+_lock = threading.Lock()
+
+def get_scheduler():
+    """Returns the process-wide BggScheduler."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = BggScheduler()
+        return _scheduler
+
+def fetch(url, params=None, priority=PRIORITY_INTERACTIVE, timeout=WAIT_TIMEOUT,
+          retry_statuses=http_client.RETRY_STATUSES):
+    return get_scheduler().fetch(url, params=params, priority=priority, timeout=timeout, retry_statuses=retry_statuses)
@@ -0,0 +1,51 @@
+"""
+Nearest-cluster assignment of games, and the cluster index of the catalog.
+
+Games are compared to CLUSTER_CENTERS on (average, log of usersrated), each
+axis divided by the spread of the centers along it, so that the number of
+ratings (0 to 100k+) does not outweigh the rating (0 to 10). A whole catalog
+is assigned in one broadcast: an (n games x 4 centers) distance matrix and
+an argmin.
+
+The index keeps the catalog rows sorted by cluster with the bounds of each
+cluster, so the games of "Hidden Treasures" are one slice.
+"""
+import numpy as np
+
+from constant.params import CLUSTER_CENTERS
+
+
+def cluster_space(average, usersrated):
+    """(n, 2) float32 points in the space clusters are compared in, missing values as 0."""
+    average = np.nan_to_num(np.asarray(average, np.float32))
+    usersrated = np.nan_to_num(np.asarray(usersrated, np.float32))
+    return np.stack([average, np.log1p(np.maximum(usersrated, 0))], axis=-1)
+
+CENTERS = cluster_space(*np.array(CLUSTER_CENTERS).T)
+SCALE = CENTERS.std(axis=0)
+
+def assign_clusters(average, usersrated):
+    """Nearest cluster of each game, as an int8 array."""
+    points = cluster_space(average, usersrated) / SCALE
+    gaps = points[:, None, :] - (CENTERS / SCALE)[None, :, :]
+    return np.einsum("ijk,ijk->ij", gaps, gaps).argmin(axis=1).astype(np.int8)
+
+
+class ClusterIndex:
+    """
+    Catalog rows grouped by cluster.
+    - order: row numbers, sorted by cluster (catalog order within a cluster)
+    - bounds: order[bounds[c]:bounds[c + 1]] are the rows of cluster c
+    """
+    def __init__(self, clusters):
+        self.clusters = np.asarray(clusters, np.int8)
+        self.order = np.argsort(self.clusters, kind="stable").astype(np.int32)
+        counts = np.bincount(self.clusters, minlength=len(CLUSTER_CENTERS))
+        self.bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    def rows(self, cluster):
+        return self.order[self.bounds[cluster]:self.bounds[cluster + 1]]
+
+    def counts(self):
+        """{cluster: number of games}"""
+        return {cluster: int(self.bounds[cluster + 1] - self.bounds[cluster]) for cluster in range(len(CLUSTER_CENTERS))}
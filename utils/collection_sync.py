@@ -0,0 +1,209 @@
+"""
+Per-user cache of BGG collections for "Based on my BGG", synced
+incrementally in the background.
+
+- The first sync of a user fetches the whole `xmlapi2/collection`. BGG
+  answers 202 while it prepares the collection: the sync polls on a worker
+  thread, the page never waits for it
+- Later syncs only ask for the games modified since the previous one
+  (`modifiedsince`), a full sync every FULL_SYNC_INTERVAL catches the games
+  removed from the collection
+- A collection synced less than SYNC_INTERVAL ago is used as is
+
+With PREDICT_COLLECTION=local, predict_userID is sent the synced collection
+instead of letting the backend pull it from BGG on every search:
+- collection_owned: IDs of the games the user owns, as "Play one of my
+  games" needs them, packed like the taxonomy filters (utils.filter_encoding)
+- collection_rated: IDs of the games the user rated, packed the same way,
+  and collection_ratings their ratings, comma-separated in increasing ID order
+- collection_token: digest of the collection (owned flags and ratings
+  included), unchanged while it is, so the predict cache keeps these results
+  longer
+Wishlist or previously owned games that are neither owned nor rated are
+not sent.
+Until the first sync is done the request stays as it is by default
+("backend"). The backend must understand these parameters.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from constant.params import BGG_COLLECTION_URL
+from utils import bgg_scheduler, http_client
+from utils.filter_encoding import encode_codes
+from utils.game_cache import get_game_cache
+from utils.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_MODE = os.environ.get("PREDICT_COLLECTION", "backend")  # "backend" or "local"
+SYNC_INTERVAL = 10 * 60  # seconds a synced collection is used without asking BGG
+FULL_SYNC_INTERVAL = 24 * 60 * 60  # seconds, removed games only disappear on a full sync
+COLLECTION_TTL = 30 * 24 * 60 * 60  # seconds a collection stays in the cache
+MODIFIED_SINCE_MARGIN = 24 * 60 * 60  # seconds, BGG's modifiedsince is a date in its own time zone
+QUEUED_POLLS = 10  # 202 answers accepted before giving up
+QUEUED_DELAY = 3  # seconds between polls of a queued collection
+SYNC_WORKERS = 2
+
+
+def user_key(user_id):
+    """BGG user names are case-insensitive."""
+    return user_id.strip().casefold()
+
+def parse_collection(content):
+    """
+    Parses a `xmlapi2/collection` answer.
+    Returns {game ID: [owned (0 or 1), user rating or None]}.
+    Raises ValueError for BGG errors, e.g. an unknown user name.
+    """
+    with timer("xml_parse_seconds", document="collection"):
+        root = ET.fromstring(content)
+        if root.tag == "errors":
+            raise ValueError(root.findtext("error/message") or "BGG collection error")
+        items = {}
+        for item in root.iter("item"):
+            status = item.find("status")
+            rating = item.find("stats/rating")
+            owned = int(status is not None and status.get("own") == "1")
+            try:
+                value = float(rating.get("value")) if rating is not None else None
+            except (TypeError, ValueError):  # "N/A" when not rated
+                value = None
+            # A game can appear several times (one entry per copy)
+            previous_owned, previous_value = items.get(item.get("objectid"), (0, None))
+            items[item.get("objectid")] = [max(owned, previous_owned), value if value is not None else previous_value]
+        return items
+
+def collection_token(items):
+    """Short digest of a collection's content."""
+    canonical = json.dumps(sorted(items.items(), key=lambda item: int(item[0])), separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class CollectionQueued(Exception):
+    """BGG was still preparing the collection after all the polls."""
+
+
+class CollectionSync:
+    """
+    Background syncs of user collections into the shared game cache.
+    - One sync at a time per user, extra requests are ignored meanwhile
+    - Sync counters are kept in `stats`
+    """
+    def __init__(self, workers=SYNC_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collection")
+        self._syncing = set()
+        self._lock = threading.Lock()
+        self.stats = {"full_syncs": 0, "incremental_syncs": 0, "failed_syncs": 0, "queued_answers": 0}
+
+    @property
+    def cache(self):
+        return get_game_cache("collection", ttl=COLLECTION_TTL)
+
+    def get(self, user_id):
+        """The cached collection of a user, None when never synced."""
+        return self.cache.get(user_key(user_id), count_stats=False)
+
+    def is_syncing(self, user_id):
+        with self._lock:
+            return user_key(user_id) in self._syncing
+
+    def request(self, user_id):
+        """
+        Returns the cached collection of a user right away (None when never
+        synced), and starts a background sync when it is older than SYNC_INTERVAL.
+        """
+        collection = self.get(user_id)
+        if collection is None or time.time() - collection["synced_at"] > SYNC_INTERVAL:
+            self.sync_in_background(user_id)
+        return collection
+
+    def sync_in_background(self, user_id):
+        key = user_key(user_id)
+        with self._lock:
+            if key in self._syncing:
+                return
+            self._syncing.add(key)
+        self._executor.submit(self._sync_in_background, user_id)
+
+    def _sync_in_background(self, user_id):
+        try:
+            self.sync(user_id)
+        except Exception as e:
+            logger.warning("Collection sync failed for %s: %s", user_id, e)
+            with self._lock:
+                self.stats["failed_syncs"] += 1
+        finally:
+            with self._lock:
+                self._syncing.discard(user_key(user_id))
+
+    def sync(self, user_id):
+        """Syncs a user's collection now, incrementally when possible. Returns it."""
+        previous = self.get(user_id)
+        now = time.time()
+        incremental = previous is not None and now - previous["full_synced_at"] < FULL_SYNC_INTERVAL
+        params = {"username": user_id.strip(), "subtype": "boardgame", "brief": 1, "stats": 1}
+        if incremental:
+            params["modifiedsince"] = time.strftime("%Y-%m-%d", time.gmtime(previous["synced_at"] - MODIFIED_SINCE_MARGIN))
+
+        items = parse_collection(self._fetch(params).content)
+        if incremental:
+            items = dict(previous["items"], **items)
+        collection = {
+            "items": items,
+            "token": collection_token(items),
+            "synced_at": now,
+            "full_synced_at": previous["full_synced_at"] if incremental else now,
+        }
+        self.cache.set(user_key(user_id), collection)
+        with self._lock:
+            self.stats["incremental_syncs" if incremental else "full_syncs"] += 1
+        return collection
+
+    def _fetch(self, params):
+        # A 202 comes straight back instead of being retried by the scheduler,
+        # no BGG worker is held while the collection is being prepared
+        retry_statuses = http_client.RETRY_STATUSES - {202}
+        for _ in range(QUEUED_POLLS):
+            response = bgg_scheduler.fetch(BGG_COLLECTION_URL, params=params, priority=bgg_scheduler.PRIORITY_PREFETCH,
+                                           retry_statuses=retry_statuses)
+            if response.status_code != 202:
+                response.raise_for_status()
+                return response
+            with self._lock:
+                self.stats["queued_answers"] += 1
+            time.sleep(QUEUED_DELAY)
+        raise CollectionQueued(f"BGG is still preparing the collection of {params['username']}")
+
+
+_collection_sync = None
+_lock = threading.Lock()
+
+def get_collection_sync():
+    """Returns the process-wide CollectionSync."""
+    global _collection_sync
+    with _lock:
+        if _collection_sync is None:
+            _collection_sync = CollectionSync()
+        return _collection_sync
+
+def collection_params(user_id, mode=None):
+    """predict_userID parameters of the synced collection, {} when off or not synced yet."""
+    if (mode or COLLECTION_MODE) != "local":
+        return {}
+    collection = get_collection_sync().request(user_id)
+    if collection is None:
+        return {}
+    items = {int(game_id): item for game_id, item in collection["items"].items()}
+    rated = sorted(game_id for game_id, (_, rating) in items.items() if rating is not None)
+    return {
+        "collection_token": collection["token"],
+        "collection_owned": encode_codes(game_id for game_id, (owned, _) in items.items() if owned),
+        "collection_rated": encode_codes(rated),
+        "collection_ratings": ",".join(f"{items[game_id][1]:g}" for game_id in rated),
+    }
@@ -0,0 +1,129 @@
+"""
+Everything the Diagnostics page shows, in one snapshot.
+
+- Timings and counters recorded through utils.metrics
+- Gauges read from the process-wide components: caches, BGG scheduler,
+  prefetcher and HTTP client
+- Export as JSON or as Prometheus text exposition format
+- Optional cProfile of the page reruns of one session
+"""
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from utils.bgg_scheduler import get_scheduler
+from utils.collection_sync import get_collection_sync
+from utils.game_cache import get_game_caches
+from utils.http_client import get_client
+from utils.image_cache import get_image_cache
+from utils.metrics import get_metrics
+from utils.predict_cache import get_predict_cache
+from utils.prefetch import get_prefetcher
+
+METRIC_PREFIX = "wwpbg_"
+PROFILE_LINES = 30
+
+
+def _gauges(component, stats, **labels):
+    """One gauge per numeric value of a component's stats dict."""
+    return [
+        {"name": f"{component}_{key}", "labels": labels, "value": value}
+        for key, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
+
+def collect_gauges():
+    gauges = []
+    for namespace, cache in sorted(get_game_caches().items()):
+        gauges += _gauges("game_cache", cache.stats(), namespace=namespace)
+    gauges += _gauges("predict_cache", get_predict_cache().stats())
+    gauges += _gauges("image_cache", get_image_cache().stats())
+    gauges += _gauges("prefetch", get_prefetcher().progress())
+    gauges += _gauges("collection_sync", get_collection_sync().stats)
+
+    scheduler = get_scheduler().metrics()
+    gauges += _gauges("bgg_scheduler", scheduler)
+    for priority, wait in scheduler["wait"].items():
+        gauges += _gauges("bgg_scheduler_wait", wait, priority=priority)
+    for priority, depth in scheduler["queue_depth"].items():
+        gauges.append({"name": "bgg_scheduler_queue_depth", "labels": {"priority": priority}, "value": depth})
+
+    for host, stats in sorted(get_client().stats.items()):
+        gauges += _gauges("http_client", stats, host=host)
+    return gauges
+
+def collect():
+    """Returns {"time", "histograms", "counters", "gauges"}."""
+    return dict(time=time.time(), **get_metrics().snapshot(), gauges=collect_gauges())
+
+
+#-------------------------------------------------------------------------
+#     Export
+#-------------------------------------------------------------------------
+def to_json(snapshot):
+    return json.dumps(snapshot, indent=2, sort_keys=True)
+
+def _metric_name(name):
+    return METRIC_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+def to_prometheus(snapshot):
+    """
+    Prometheus text exposition format.
+    - Histograms are exported as summaries (p50, p95, p99, sum, count)
+    - Counters and gauges as they are
+    """
+    lines, typed = [], set()
+    def add(name, kind, labels, value):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{labels} {value}")
+
+    for histogram in snapshot["histograms"]:
+        name = _metric_name(histogram["name"])
+        for quantile in ("p50", "p95", "p99"):
+            add(name, "summary", _labels(histogram["labels"], quantile=int(quantile[1:]) / 100), histogram[quantile])
+        lines.append(f"{name}_sum{_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_labels(histogram['labels'])} {histogram['count']}")
+    for counter in snapshot["counters"]:
+        add(_metric_name(counter["name"]), "counter", _labels(counter["labels"]), counter["value"])
+    for gauge in snapshot["gauges"]:
+        add(_metric_name(gauge["name"]), "gauge", _labels(gauge["labels"]), gauge["value"])
+    return "\n".join(lines) + "\n"
+
+
+#-------------------------------------------------------------------------
+#     Profiling
+#-------------------------------------------------------------------------
+@contextmanager
+def profile_rerun(page):
+    """
+    Runs the block under cProfile when profiling is on for this session
+    (toggle on the Diagnostics page). The top functions by cumulative
+    time are kept in session state, per page.
+    """
+    if not st.session_state.get('profile_reruns'):
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        st.session_state.setdefault('profiles', {})[page] = report.getvalue()
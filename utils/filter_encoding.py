@@ -0,0 +1,121 @@
+"""
+Compact, versioned encoding of the taxonomy filters sent to predict_*.
+
+Instead of `str(list)` of full labels, each selection is sent as the integer
+codes of the taxonomy index (rows of the categories_data parquet
+dictionaries), packed in whichever form is shorter:
+- bitset: "1.b.<base64url of the bytes, bit n set for code n>"
+- delta list: "1.d.<base36 gaps between sorted codes, '-' separated>"
+
+The leading number is FILTER_ENCODING_VERSION, so the backend can tell
+formats apart. The backend must understand this format: it is only used
+when PREDICT_FILTER_ENCODING=compact, the default stays "legacy".
+"""
+import ast
+import base64
+import math
+import os
+
+import requests
+
+from utils.taxonomy import load_taxonomy_index
+
+FILTER_ENCODING_VERSION = 1
+FILTER_ENCODING = os.environ.get("PREDICT_FILTER_ENCODING", "legacy")  # "legacy" or "compact"
+MAX_GET_URL_LENGTH = 2000  # longer compact requests are sent as POST JSON
+FILTER_FIELDS = {  # request parameter: taxonomy vocabulary
+    "boardgamecategory": "category",
+    "boardgamemechanic": "mechanic",
+    "boardgamefamily": "family",
+}
+
+
+def _to_base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        text = digits[remainder] + text
+        if not number:
+            return text
+
+def encode_codes(codes):
+    """Packs a set of non-negative integer codes into a short URL-safe string."""
+    codes = sorted(set(codes))
+    prefix = f"{FILTER_ENCODING_VERSION}."
+    if not codes:
+        return prefix + "d."
+
+    gaps, previous = [], -1
+    for code in codes:
+        gaps.append(_to_base36(code - previous - 1))
+        previous = code
+    delta = prefix + "d." + "-".join(gaps)
+
+    bits = bytearray(codes[-1] // 8 + 1)
+    for code in codes:
+        bits[code // 8] |= 1 << (code % 8)
+    bitset = prefix + "b." + base64.urlsafe_b64encode(bytes(bits)).decode("ascii").rstrip("=")
+
+    return min(delta, bitset, key=len)
+
+def decode_codes(text):
+    """Inverse of encode_codes, returns the sorted list of codes."""
+    version, kind, payload = text.split(".", 2)
+    if int(version) != FILTER_ENCODING_VERSION:
+        raise ValueError(f"Unsupported filter encoding version: {version}")
+    if kind == "d":
+        codes, previous = [], -1
+        for gap in filter(None, payload.split("-")):
+            previous += int(gap, 36) + 1
+            codes.append(previous)
+        return codes
+    if kind == "b":
+        bits = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        return [i * 8 + bit for i, byte in enumerate(bits) for bit in range(8) if byte >> bit & 1]
+    raise ValueError(f"Unknown filter encoding: {kind}")
+
+def encode_filters(game_details, encoding=None):
+    """
+    Returns the taxonomy request parameters for the selected labels.
+    - "legacy": str(list) of labels, as the current backend expects
+    - "compact": packed taxonomy codes plus a filter_encoding version field
+    """
+    encoding = encoding or FILTER_ENCODING
+    if encoding == "legacy":
+        return {field: str(game_details[field]) for field in FILTER_FIELDS}
+
+    taxonomy = load_taxonomy_index()
+    params = {"filter_encoding": FILTER_ENCODING_VERSION}
+    for field, vocabulary in FILTER_FIELDS.items():
+        params[field] = encode_codes(taxonomy[vocabulary].code_of(label) for label in game_details[field] if label)
+    return params
+
+def decode_filters(params):
+    """
+    Inverse of encode_filters, whichever the encoding.
+    Returns {request parameter: list of taxonomy codes}, labels missing
+    from the taxonomy index are dropped.
+    """
+    taxonomy = load_taxonomy_index()
+    codes = {}
+    for field, vocabulary in FILTER_FIELDS.items():
+        value = params.get(field)
+        if value is None or isinstance(value, float) and math.isnan(value):
+            codes[field] = []
+        elif "filter_encoding" in params:
+            codes[field] = decode_codes(value)
+        else:
+            labels = ast.literal_eval(value) if isinstance(value, str) else value
+            known = taxonomy[vocabulary]
+            codes[field] = [known.code_of(label) for label in labels if label in known]
+    return codes
+
+def use_post(url, params, encoding=None):
+    """
+    POST JSON is only understood alongside the compact encodings (taxonomy
+    filters, or the collection of utils.collection_sync), for long requests.
+    """
+    if (encoding or FILTER_ENCODING) == "legacy" and "collection_token" not in params:
+        return False
+    return len(requests.Request("GET", url, params=params).prepare().url) > MAX_GET_URL_LENGTH
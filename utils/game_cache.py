@@ -0,0 +1,269 @@
+"""
+Persistent cache for parsed BoardGameGeek records.
+
+Records are stored as JSON, keyed by BGG object ID, with a per-entry TTL.
+The default SQLite backend lives on disk, so every Streamlit worker on the
+host shares warm data and nothing is lost on restart. The backend can be
+swapped with the BGG_CACHE_BACKEND environment variable (see BACKENDS).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.environ.get("BGG_CACHE_PATH", ".cache/bgg_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.environ.get("BGG_CACHE_MAX_ENTRIES", 50_000))
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds, game metadata rarely changes
+
+
+#-------------------------------------------------------------------------
+#
+#     BACKENDS
+#
+#-------------------------------------------------------------------------
+class CacheBackend(ABC):
+    """
+    Storage of raw JSON strings keyed by string.
+    - get/get_many return (value, expires_at) tuples
+    - set stores a value until expires_at (epoch seconds)
+    - the least recently used entries are evicted above max_entries
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    def get_many(self, keys):
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    @abstractmethod
+    def set(self, key, value, expires_at):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU dictionary, useful for tests and single-worker setups."""
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                self._entries.move_to_end(key)
+            return item
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite file shared by all processes on the host.
+    WAL mode lets several Streamlit workers read while one writes.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value, expires_at FROM entries WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE entries SET accessed_at = ? WHERE key IN ({','.join('?' * len(rows))})",
+                    [time.time()] + [row[0] for row in rows],
+                )
+        return {key: (value, expires_at) for key, value, expires_at in rows}
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "memory": MemoryBackend,
+}
+
+
+#-------------------------------------------------------------------------
+#
+#     CACHE
+#
+#-------------------------------------------------------------------------
+class GameCache:
+    """
+    Read-through cache of parsed game records for one kind of BGG data.
+    - Keys are BGG object IDs, prefixed with the namespace in the backend
+    - Each entry expires after its own TTL
+    - Hits and misses are counted for this process
+    """
+    def __init__(self, backend, namespace="boardgame", ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, game_id):
+        return f"{self.namespace}:{game_id}"
+
+    def get(self, game_id, count_stats=True):
+        return self.get_many([game_id], count_stats).get(str(game_id))
+
+    def get_many(self, game_ids, count_stats=True):
+        """
+        Returns a dict {game_id: record} of the fresh entries found.
+        Background lookups pass count_stats=False to keep the hit rate
+        about what users actually asked for.
+        """
+        game_ids = [str(game_id) for game_id in game_ids]
+        found = self.backend.get_many([self._key(game_id) for game_id in game_ids])
+        now = time.time()
+        records = {}
+        for game_id in game_ids:
+            item = found.get(self._key(game_id))
+            if item is None:
+                continue
+            value, expires_at = item
+            if expires_at < now:
+                self.backend.delete(self._key(game_id))
+                continue
+            records[game_id] = json.loads(value)
+        if count_stats:
+            self.hits += len(records)
+            self.misses += len(game_ids) - len(records)
+        return records
+
+    def set(self, game_id, record, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self.backend.set(self._key(game_id), json.dumps(record), expires_at)
+
+    def set_many(self, records, ttl=None):
+        for game_id, record in records.items():
+            self.set(game_id, record, ttl)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_backend = None
+_caches = {}
+_lock = threading.Lock()
+
+def get_backend():
+    """Returns the process-wide backend selected by BGG_CACHE_BACKEND."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = BACKENDS[os.environ.get("BGG_CACHE_BACKEND", "sqlite")]()
+        return _backend
+
+def get_game_caches():
+    """Returns the GameCache created so far, by namespace."""
+    with _lock:
+        return dict(_caches)
+
+def get_game_cache(namespace="boardgame", ttl=DEFAULT_TTL):
+    """
+    Returns the process-wide GameCache for a namespace.
+    Raises ValueError when it was created with another TTL.
+    """
+    backend = get_backend()
+    with _lock:
+        if namespace not in _caches:
+            _caches[namespace] = GameCache(backend, namespace=namespace, ttl=ttl)
+        cache = _caches[namespace]
+    if cache.ttl != ttl:
+        raise ValueError(f"The {namespace} cache has a TTL of {cache.ttl} s, not {ttl} s")
+    return cache
@@ -0,0 +1,55 @@
+"""
+Compact records for the predicted games kept in session state.
+
+The predict endpoints return every column they know about, full
+description included. A result list only shows a handful of fields, so
+each game is projected to a slotted record as soon as it is received.
+The full game is loaded on demand by the "More infos" page, from BGG.
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+DESCRIPTION_CHARS = 100
+
+
+def as_number(value):
+    """Numeric value of a game field, None when missing or not a number."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+@dataclass(frozen=True, slots=True)
+class GameResult:
+    objectid: str
+    name: str
+    age: object
+    thumbnail: str
+    has_image: bool
+    description: str
+    rating: Optional[float] = None
+
+    @classmethod
+    def from_prediction(cls, game):
+        '''
+        Projects a game dict returned by a predict endpoint.
+        - The description is cut to what a result card shows
+        - Missing values keep the labels the cards used to display
+        '''
+        description = game.get('description') or 'No description available'
+        return cls(
+            objectid=str(game.get('@objectid')),
+            name=game.get('name', 'N/A'),
+            age=game.get('age', 'Not specified'),
+            thumbnail=game.get('thumbnail') or '',
+            has_image=bool(game.get('image')),
+            description=description[:DESCRIPTION_CHARS],
+            rating=as_number(game.get('average', game.get('rating'))),
+        )
+
+
+def project_games(games):
+    return [GameResult.from_prediction(game) for game in games]
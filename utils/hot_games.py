@@ -0,0 +1,185 @@
+"""
+Hot games banner data, served stale-while-revalidate.
+
+The banner renders from an in-memory snapshot. At start-up the snapshot is
+loaded from the last persisted copy (or the bundled one) and a background
+thread refreshes it on a schedule, so page renders never wait on BGG.
+
+Run `python -m utils.hot_games` to refresh the bundled snapshot.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from constant.params import BGG_HOT_URL, BGG_THING_URL, HOT_GAMES_TTL
+from utils import bgg_scheduler
+from utils.game_cache import get_game_cache
+from utils.image_cache import get_image_cache
+from utils.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_SNAPSHOT_PATH = "data/hot_games.json"
+PERSISTED_SNAPSHOT_PATH = os.environ.get("HOT_GAMES_SNAPSHOT_PATH", ".cache/hot_games.json")
+HOT_GAMES_LIMIT = 10
+REFRESH_INTERVAL = HOT_GAMES_TTL  # seconds
+RETRY_INTERVAL = 60  # seconds between attempts after a failed refresh
+
+
+def fetch_hot_games(limit=HOT_GAMES_LIMIT):
+    """
+    Fetches the top N hot games on BoardGameGeek in at most two requests:
+    the hot list, then a single batched `thing` call for the IDs missing
+    from the shared game cache.
+    Returns a list of tuples: (title, image_url), in hot list order.
+    """
+    hot_cache = get_game_cache("hot", ttl=HOT_GAMES_TTL)
+    game_ids = hot_cache.get("boardgame")
+    if game_ids is None:
+        response = bgg_scheduler.fetch(BGG_HOT_URL, priority=bgg_scheduler.PRIORITY_BANNER)
+        response.raise_for_status()
+        with timer("xml_parse_seconds", document="hot"):
+            game_ids = [item.attrib["id"] for item in ET.fromstring(response.content).findall("item")]
+        hot_cache.set("boardgame", game_ids)
+    game_ids = game_ids[:limit]
+    if not game_ids:
+        return []
+
+    thing_cache = get_game_cache("thing")
+    details = thing_cache.get_many(game_ids)
+    missing_ids = [game_id for game_id in game_ids if game_id not in details]
+    if missing_ids:
+        # Fetch all missing game details at once
+        details_resp = bgg_scheduler.fetch(BGG_THING_URL, params={"id": ",".join(missing_ids)},
+                                            priority=bgg_scheduler.PRIORITY_BANNER)
+        details_resp.raise_for_status()
+        fetched = {}
+        with timer("xml_parse_seconds", document="thing"):
+            for item in ET.fromstring(details_resp.content).findall("item"):
+                name = item.find("name[@type='primary']")
+                image = item.find("image")
+                if name is not None and image is not None:
+                    fetched[item.attrib["id"]] = {"name": name.attrib["value"], "image": image.text}
+        thing_cache.set_many(fetched)
+        details.update(fetched)
+
+    return [(details[game_id]["name"], details[game_id]["image"]) for game_id in game_ids if game_id in details]
+
+
+class HotGamesSnapshot:
+    """Immutable copy of the banner data and where it came from."""
+    def __init__(self, games, updated_at=None, source="empty"):
+        self.games = [tuple(game) for game in games]
+        self.updated_at = updated_at
+        self.source = source
+
+    def age(self):
+        """Seconds since the data was fetched from BGG, None if unknown."""
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    @classmethod
+    def load(cls, path, source):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["games"], data.get("updated_at"), source)
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated_at": self.updated_at, "games": self.games}, f, indent=1)
+        os.replace(tmp_path, path)  # atomic, other workers never read half a file
+
+
+class HotGamesRefresher:
+    """
+    Holds the current snapshot and refreshes it in a daemon thread.
+    Readers only ever swap in a complete snapshot, no lock is needed.
+    """
+    def __init__(self, limit=HOT_GAMES_LIMIT, interval=REFRESH_INTERVAL,
+                 persisted_path=PERSISTED_SNAPSHOT_PATH, bundled_path=BUNDLED_SNAPSHOT_PATH):
+        self.limit = limit
+        self.interval = interval
+        self.persisted_path = persisted_path
+        self.bundled_path = bundled_path
+        self.last_error = None
+        self.snapshot = self._load_initial()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _load_initial(self):
+        for path, source in [(self.persisted_path, "persisted"), (self.bundled_path, "bundled")]:
+            try:
+                snapshot = HotGamesSnapshot.load(path, source)
+            except (OSError, ValueError, KeyError):
+                continue
+            if snapshot.games:
+                return snapshot
+        return HotGamesSnapshot([])
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._warm_images()
+                self._thread = threading.Thread(target=self._run, name="hot-games-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def refresh(self):
+        """Fetches the hot list now, keeps the previous snapshot on failure."""
+        try:
+            games = fetch_hot_games(self.limit)
+        except Exception as e:
+            self.last_error = e
+            logger.warning("Hot games refresh failed: %s", e)
+            return False
+        if not games:
+            self.last_error = ValueError("empty hot list")
+            logger.warning("Hot games refresh failed: BGG answered an empty hot list")
+            return False
+        self.last_error = None
+        self.snapshot = HotGamesSnapshot(games, time.time(), "network")
+        self._warm_images()
+        try:
+            self.snapshot.save(self.persisted_path)
+        except OSError as e:
+            logger.warning("Could not persist hot games snapshot: %s", e)
+        return True
+
+    def _warm_images(self):
+        get_image_cache().warm(image_url for _, image_url in self.snapshot.games)
+
+    def _run(self):
+        while True:
+            age = self.snapshot.age()
+            if age is None or age >= self.interval:
+                delay = self.interval if self.refresh() else RETRY_INTERVAL
+            else:
+                delay = self.interval - age
+            time.sleep(delay)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+def get_refresher():
+    """Returns the process-wide refresher, started on first use."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = HotGamesRefresher()
+    return _refresher.start()
+
+def get_hot_games_snapshot():
+    return get_refresher().snapshot
+
+
+if __name__ == "__main__":
+    refresher = HotGamesRefresher(persisted_path=BUNDLED_SNAPSHOT_PATH)
+    if not refresher.refresh():
+        raise SystemExit(f"Could not refresh the hot games snapshot: {refresher.last_error}")
+    print(f"Saved {len(refresher.snapshot.games)} games to {BUNDLED_SNAPSHOT_PATH}")
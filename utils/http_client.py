@@ -0,0 +1,151 @@
+"""
+Shared HTTP client for BoardGameGeek and the prediction API.
+
+- One keep-alive requests.Session (connection pool) per host
+- Connect and read timeouts on every call
+- Retries with jittered exponential backoff on connection errors, 5xx,
+  429 (honouring Retry-After) and BGG's 202 "queued" answers
+- Per-call latency logged, aggregated per host in `stats` and recorded
+  per endpoint in utils.metrics
+"""
+import logging
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 3.05  # seconds
+READ_TIMEOUT = 30  # seconds, leaves room for Cloud Run cold starts
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_MAX = 10  # seconds
+RETRY_STATUSES = {202, 429, 500, 502, 503, 504}
+POOL_SIZE = 10  # connections kept alive per host
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with timeouts and retries.
+    A read timeout is not retried: the backend is answering too slowly and
+    trying again would only make the user wait longer.
+    """
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.stats = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """Returns the keep-alive session of the url's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    def request(self, method, url, timeout=None, retry_statuses=RETRY_STATUSES, endpoint=None, max_retries=None,
+                **kwargs):
+        """
+        Sends a request, retrying transient failures.
+        - endpoint names the call in the metrics, the URL path by default
+        - max_retries overrides the client's, 0 for callers retrying on their own
+        Returns the last response, or raises the last connection error
+        when no response was ever received.
+        """
+        session = self.session(url)
+        host = urlsplit(url).netloc
+        max_retries = self.max_retries if max_retries is None else max_retries
+        start = time.perf_counter()
+        for attempt in range(max_retries + 1):
+            response, error = None, None
+            try:
+                response = session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.ConnectionError as e:
+                error = e
+            if response is not None and response.status_code not in retry_statuses:
+                break
+            if attempt == max_retries:
+                break
+            if response is not None:
+                response.close()  # give a streamed connection back to the pool
+            delay = backoff_delay(attempt, response)
+            logger.info("%s %s: %s, retrying in %.1fs", method, url,
+                        error or f"status {response.status_code}", delay)
+            time.sleep(delay)
+
+        latency = time.perf_counter() - start
+        self._record(host, latency, attempt, failed=response is None)
+        endpoint = endpoint or endpoint_path(url)
+        metrics.observe("http_request_seconds", latency, host=host, endpoint=endpoint)
+        metrics.increment("http_requests_total", host=host, endpoint=endpoint,
+                          status=response.status_code if response is not None else "failed")
+        if attempt:
+            metrics.increment("http_retries_total", attempt, host=host, endpoint=endpoint)
+        logger.info("%s %s: %s in %.3fs (%d retries)", method, url,
+                    response.status_code if response is not None else "failed", latency, attempt)
+        if response is None:
+            raise error
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, host, latency, retries, failed):
+        with self._lock:
+            host_stats = self.stats.setdefault(
+                host, {"calls": 0, "retries": 0, "failures": 0, "total_latency": 0.0, "last_latency": 0.0}
+            )
+            host_stats["calls"] += 1
+            host_stats["retries"] += retries
+            host_stats["failures"] += int(failed)
+            host_stats["total_latency"] += latency
+            host_stats["last_latency"] = latency
+
+
+def backoff_delay(attempt, response=None):
+    """Seconds to wait before retrying after `attempt` failed attempts."""
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    # Full jitter keeps concurrent sessions from retrying in lockstep
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def endpoint_path(url):
+    """URL path with the game IDs masked, e.g. /xmlapi/boardgame/{ids}."""
+    return re.sub(r"/[0-9,%C]+(?=/|$)", "/{ids}", urlsplit(url).path)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the process-wide HttpClient."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
@@ -0,0 +1,186 @@
+"""
+Local cache of BGG images, resized once per display variant.
+
+Each image is downloaded once, then every variant of VARIANTS is written to
+disk as a JPEG. Files are shared by all workers on the host; the least
+recently used images (all their variants together) are deleted above
+IMAGE_CACHE_MAX_BYTES.
+
+Pages read with fetch=False and fall back to the original URL, while the
+downloads happen in the background (`warm`), so renders never wait.
+"""
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from utils import http_client
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_DIR = os.environ.get("BGG_IMAGE_CACHE_DIR", ".cache/images")
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("BGG_IMAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+VARIANTS = {  # bounding box (width, height) in pixels
+    "banner": (220, 250),  # hot games scroller tiles
+    "thumbnail": (100, 100),  # prediction results list
+    "hero": (600, 600),  # game page header
+}
+JPEG_QUALITY = 85
+WARM_WORKERS = 4
+
+
+class ImageCache:
+    """Disk cache of resized images with an LRU size cap."""
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None  # running total of the directory, scanned on first write
+        self._executor = ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix="images")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _path(self, url, variant):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}_{variant}.jpg")
+
+    def get(self, url, variant, fetch=True):
+        """
+        Returns the JPEG bytes of the variant of an image.
+        Downloads and resizes it when missing, unless fetch=False.
+        Returns None when the image is not available.
+        """
+        if not url:
+            return None
+        path = self._path(url, variant)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # recently used, see _evict
+        except OSError:
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is not None:
+            return data
+        if not fetch:
+            return None
+        try:
+            self._download(url)
+            with open(path, "rb") as f:
+                return f.read()
+        except Exception as e:
+            logger.warning("Could not cache image %s: %s", url, e)
+            return None
+
+    def data_uri(self, url, variant, fetch=False):
+        """Returns the variant as a data URI for HTML, or the original URL."""
+        data = self.get(url, variant, fetch=fetch)
+        if data is None:
+            return url
+        return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+    def has_all_variants(self, url):
+        return all(os.path.exists(self._path(url, variant)) for variant in VARIANTS)
+
+    def warm(self, urls):
+        """Downloads the images missing any variant in the background."""
+        for url in dict.fromkeys(urls):
+            if not url or self.has_all_variants(url):
+                continue
+            with self._lock:
+                if url in self._pending:
+                    continue
+                self._pending.add(url)
+            self._executor.submit(self._warm_one, url)
+
+    def _warm_one(self, url):
+        try:
+            self._download(url)
+        except Exception as e:
+            logger.warning("Could not cache image %s: %s", url, e)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _download(self, url):
+        """Downloads an image once and writes all its variants."""
+        response = http_client.get(url, endpoint="image")
+        response.raise_for_status()
+        original = Image.open(io.BytesIO(response.content)).convert("RGB")
+        written = 0
+        for variant, size in VARIANTS.items():
+            image = original.copy()
+            image.thumbnail(size)
+            path = self._path(url, variant)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            written += os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            else:
+                self._bytes += written
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _scan(self):
+        """Returns ({image digest: (last use, bytes, [paths])}, total bytes) of the directory."""
+        images = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                digest = entry.name.split("_", 1)[0]
+                last_used, size, paths = images.get(digest, (0, 0, []))
+                images[digest] = (max(last_used, stat.st_mtime), size + stat.st_size, paths + [entry.path])
+        return images, sum(size for _, size, _ in images.values())
+
+    def _evict(self):
+        """
+        Deletes the least recently used images above max_bytes, every
+        variant of an image at once. Only runs when the running total is
+        over the cap, the directory is rescanned then: other workers write
+        to it too.
+        """
+        images, total = self._scan()
+        for _, size, paths in sorted(images.values()):
+            if total <= self.max_bytes:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        with self._lock:
+            self._bytes = total
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+_image_cache = None
+_cache_lock = threading.Lock()
+
+def get_image_cache():
+    """Returns the process-wide ImageCache."""
+    global _image_cache
+    with _cache_lock:
+        if _image_cache is None:
+            _image_cache = ImageCache()
+        return _image_cache
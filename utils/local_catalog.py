@@ -0,0 +1,304 @@
+"""
+Local game catalog and vectorized scorer, answering "Game for a friend"
+when the prediction backend is cold or slow.
+
+The catalog is a columnar parquet artifact built offline from BGG records
+(`make game_catalog`, see read_game_ids for the game IDs): numeric features
+plus the taxonomy codes of each game, as in utils.taxonomy. Once loaded, the features
+are a float32 matrix and the taxonomy a flat array of (game row, code)
+pairs, so scoring every game for one request is a few NumPy operations.
+Games are grouped by nearest cluster (utils.clusters): a request only
+scores the games of the cluster its average/usersrated point falls in.
+
+The scorer takes the same parameters as predict_filters:
+- distance to the cluster center (average, log of usersrated), the playing
+  time, minimum players, age and year published; "Any" (NaN) is ignored
+- share of the selected categories, mechanics and families a game has
+
+LOCAL_PREDICT_MODE chooses how it is used:
+- "fallback": only when the backend call fails
+- "race": the backend gets LOCAL_RACE_TIMEOUT seconds, then the local
+  answer is shown while the backend call ends in the background (its
+  result is cached for the next identical search)
+- "off"
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import numpy as np
+
+from utils import metrics
+from utils.clusters import ClusterIndex, assign_clusters
+from utils.filter_encoding import FILTER_FIELDS, decode_filters
+from utils.game_results import DESCRIPTION_CHARS
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.environ.get("LOCAL_CATALOG_PATH", "data/game_catalog.parquet")
+LOCAL_PREDICT_MODE = os.environ.get("LOCAL_PREDICT_MODE", "fallback")  # "fallback", "race" or "off"
+LOCAL_RACE_TIMEOUT = float(os.environ.get("LOCAL_RACE_TIMEOUT", 2.0))  # seconds
+LOCAL_ENDPOINTS = ("predict_filters",)
+LOCAL_SOURCE = "local"  # "source" of the games answered by the scorer
+TOP_K = 50
+TAXONOMY_WEIGHT = 2.0  # a game with all the selected labels gains 2 standard deviations
+
+FEATURES = ("average", "usersrated", "playingtime", "minplayers", "age", "yearpublished")
+LOG_FEATURES = ("usersrated", "playingtime")  # heavy tailed, compared in log space
+TEXT_COLUMNS = ("name", "thumbnail", "image", "description")
+
+
+def transform(features):
+    """Feature matrix (or request vector) in the space distances are computed in."""
+    features = np.array(features, dtype=np.float32)
+    for column in (FEATURES.index(name) for name in LOG_FEATURES):
+        features[..., column] = np.log1p(np.maximum(features[..., column], 0))
+    return features
+
+
+class GameCatalog:
+    """
+    Games of the catalog, as columns.
+    - ids: BGG object IDs (int64)
+    - text: {column: object array} of TEXT_COLUMNS, alternate_names the
+      other names of each game
+    - features: float32 matrix, one column per FEATURES, NaN when missing
+    - taxonomy: {request parameter: (game rows, codes)} int32 arrays
+    - clusters: ClusterIndex of the games, the "cluster" column when the
+      artifact has it
+    """
+    def __init__(self, frame):
+        self.ids = frame["objectid"].to_numpy(np.int64)
+        self._id_order = np.argsort(self.ids, kind="stable")
+        self.text = {column: frame[column].to_numpy(object) for column in TEXT_COLUMNS}
+        if "alternate_names" in frame:
+            self.alternate_names = frame["alternate_names"].to_numpy(object)
+        else:
+            self.alternate_names = np.empty(len(frame), object)
+            self.alternate_names[:] = [[]] * len(frame)
+        self.raw = frame[list(FEATURES)].to_numpy(np.float32)
+        self.features = transform(self.raw)
+        scale = np.nanstd(self.features, axis=0) if len(self) else np.ones(len(FEATURES))
+        self.scale = np.where(np.nan_to_num(scale) > 0, scale, 1).astype(np.float32)
+        self.taxonomy = {}
+        for field in FILTER_FIELDS:
+            lists = frame[field].to_numpy(object)
+            lengths = np.fromiter((len(codes) for codes in lists), np.int64, len(lists))
+            codes = np.concatenate([np.asarray(codes, np.int32) for codes in lists]) if lengths.sum() else np.zeros(0, np.int32)
+            self.taxonomy[field] = (np.repeat(np.arange(len(lists), dtype=np.int32), lengths), codes)
+        if "cluster" in frame:
+            clusters = frame["cluster"].to_numpy(np.int8)
+        else:
+            clusters = assign_clusters(frame["average"], frame["usersrated"])
+        self.clusters = ClusterIndex(clusters)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows_of(self, game_ids):
+        """Catalog row of each game ID, -1 for the games outside the catalog."""
+        game_ids = np.asarray(game_ids, np.int64)
+        if not len(self):
+            return np.full(len(game_ids), -1)
+        sorted_ids = self.ids[self._id_order]
+        positions = np.minimum(np.searchsorted(sorted_ids, game_ids), len(self) - 1)
+        return np.where(sorted_ids[positions] == game_ids, self._id_order[positions], -1)
+
+    def distances(self, params, rows):
+        """Scaled euclidean distance of the games at rows to the requested features."""
+        target = transform([float(params.get(name, np.nan)) for name in FEATURES])
+        columns = np.flatnonzero(~np.isnan(target))
+        if not len(columns):
+            return np.zeros(len(rows), np.float32)
+        gaps = (self.features[np.ix_(rows, columns)] - target[columns]) / self.scale[columns]
+        # A missing value is as far as one standard deviation
+        gaps = np.nan_to_num(gaps, nan=1.0)
+        return np.sqrt(np.einsum("ij,ij->i", gaps, gaps))
+
+    def overlaps(self, params):
+        """Share of the selected taxonomy labels each game has, averaged over the selected fields."""
+        total, fields = np.zeros(len(self), np.float32), 0
+        for field, selected in decode_filters(params).items():
+            if not selected:
+                continue
+            rows, codes = self.taxonomy[field]
+            wanted = np.zeros(max(int(codes.max(initial=0)), max(selected)) + 1, bool)
+            wanted[selected] = True
+            total += np.bincount(rows[wanted[codes]], minlength=len(self)) / len(set(selected))
+            fields += 1
+        return total / fields if fields else total
+
+    def candidates(self, params):
+        """Rows of the requested cluster, every row when the request has no cluster center or it is empty."""
+        average, usersrated = float(params.get("average", np.nan)), float(params.get("usersrated", np.nan))
+        if not (np.isnan(average) or np.isnan(usersrated)):
+            rows = self.clusters.rows(assign_clusters([average], [usersrated])[0])
+            if len(rows):
+                return rows
+        return np.arange(len(self), dtype=np.int32)
+
+    def score(self, params, rows):
+        """Higher is better, for the games at rows."""
+        return TAXONOMY_WEIGHT * self.overlaps(params)[rows] - self.distances(params, rows)
+
+    def predict(self, params, top_k=TOP_K):
+        """The top_k games for the request, as the predict endpoints return them."""
+        rows = self.candidates(params)
+        scores = self.score(params, rows)
+        top_k = min(top_k, len(rows))
+        if not top_k:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self.game(rows[i], scores[i]) for i in best]
+
+    def game(self, row, score):
+        game = {"@objectid": str(self.ids[row]), "score": float(score), "source": LOCAL_SOURCE}
+        game.update({column: self.text[column][row] or "" for column in TEXT_COLUMNS})
+        for name in ("average", "age", "yearpublished"):
+            value = self.raw[row, FEATURES.index(name)]
+            if not np.isnan(value):
+                game[name] = float(value) if name == "average" else int(value)
+        return game
+
+
+#-------------------------------------------------------------------------
+#     Catalog artifact
+#-------------------------------------------------------------------------
+def catalog_frame(records):
+    """Catalog columns from BGG game records (utils.bgg_parser), unknown taxonomy labels dropped."""
+    import pandas as pd
+
+    from utils.taxonomy import load_taxonomy_index
+
+    taxonomy = load_taxonomy_index()
+    rows = []
+    for record in records:
+        row = {
+            "objectid": int(record["@objectid"]),
+            "name": record["main_name"],
+            "thumbnail": record["thumbnail"],
+            "image": record["image"],
+            "description": record["description"][:DESCRIPTION_CHARS],
+            "alternate_names": [name for name in record["name"] if name and name != record["main_name"]],
+        }
+        row.update({name: np.nan if record.get(name, "") == "" else record[name] for name in FEATURES})
+        for field, vocabulary in FILTER_FIELDS.items():
+            known = taxonomy[vocabulary]
+            row[field] = sorted({known.code_of(label) for label in record[field] if label in known})
+        rows.append(row)
+    frame = pd.DataFrame(rows, columns=["objectid", *TEXT_COLUMNS, "alternate_names", *FEATURES, *FILTER_FIELDS])
+    frame = frame.astype({name: "float32" for name in FEATURES})
+    frame["cluster"] = assign_clusters(frame["average"], frame["usersrated"])
+    return frame
+
+def read_game_ids(path, top=None):
+    """
+    Game IDs to build the catalog from, either:
+    - BGG's ranks data dump (boardgames_ranks.csv, from
+      https://boardgamegeek.com/data_dumps/bg_ranks): the ranked games, best
+      ranked first, expansions left out
+    - a text file of one BGG game ID per line
+    top keeps the first ones only.
+    """
+    import csv
+
+    with open(path, newline="", encoding="utf-8") as f:
+        first_line = f.readline()
+        f.seek(0)
+        if first_line.split(",")[0].strip() == "id":
+            ranked = []
+            for row in csv.DictReader(f):
+                if row.get("is_expansion", "0") != "1" and row.get("rank", "0") not in ("", "0"):
+                    ranked.append((int(row["rank"]), row["id"]))
+            game_ids = [game_id for _, game_id in sorted(ranked)]
+        else:
+            game_ids = [line.strip() for line in f if line.strip()]
+    return game_ids[:top]
+
+def build_catalog(game_ids, path=CATALOG_PATH):
+    """Fetches the games from BGG (through the game cache) and saves the catalog."""
+    from utils import bgg_scheduler
+    from utils.bgg_games import fetch_games
+
+    games = fetch_games(game_ids, priority=bgg_scheduler.PRIORITY_PREFETCH)
+    frame = catalog_frame(games.values())
+    frame.to_parquet(path, index=False)
+    return frame
+
+def load_catalog(path=CATALOG_PATH):
+    import pandas as pd
+
+    with metrics.timer("catalog_load_seconds"):
+        return GameCatalog(pd.read_parquet(path))
+
+_catalog = None
+_loaded = False
+_lock = threading.Lock()
+
+def get_catalog():
+    """Returns the process-wide GameCatalog, None when there is no catalog file."""
+    global _catalog, _loaded
+    with _lock:
+        if not _loaded:
+            _loaded = True
+            if os.path.exists(CATALOG_PATH):
+                try:
+                    _catalog = load_catalog()
+                except Exception as e:
+                    logger.warning("Could not load the local catalog %s: %s", CATALOG_PATH, e)
+        return _catalog
+
+
+#-------------------------------------------------------------------------
+#     Fallback and race
+#-------------------------------------------------------------------------
+_race_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="predict-race")
+
+def races(endpoint, mode=None):
+    """Whether the backend call of this endpoint runs against the local scorer (in a worker thread)."""
+    return (mode or LOCAL_PREDICT_MODE) == "race" and endpoint in LOCAL_ENDPOINTS and get_catalog() is not None
+
+def with_local_fallback(endpoint, params, backend, mode=None):
+    """
+    Calls backend(), returning (games, error), according to LOCAL_PREDICT_MODE.
+    The local answer is used when the backend fails, or when it is too slow
+    in race mode. Local games have "source": LOCAL_SOURCE.
+    """
+    mode = mode or LOCAL_PREDICT_MODE
+    catalog = get_catalog() if mode != "off" and endpoint in LOCAL_ENDPOINTS else None
+    if catalog is None:
+        return backend()
+
+    if mode == "race":
+        future = _race_executor.submit(backend)
+        try:
+            games, error = future.result(timeout=LOCAL_RACE_TIMEOUT)
+            reason = "error"
+        except TimeoutError:
+            games, error, reason = [], "timeout", "timeout"
+    else:
+        games, error = backend()
+        reason = "error"
+    if not error:
+        return games, error
+
+    with metrics.timer("local_predict_seconds", endpoint=endpoint):
+        games = catalog.predict(params)
+    metrics.increment("local_predict_answers_total", endpoint=endpoint, reason=reason)
+    return games, None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Builds the local game catalog from BGG")
+    parser.add_argument("ids", help="BGG ranks data dump (boardgames_ranks.csv) or file with one BGG game ID per line")
+    parser.add_argument("--top", type=int, help="only the first games of the file")
+    parser.add_argument("--output", default=CATALOG_PATH)
+    args = parser.parse_args()
+
+    game_ids = read_game_ids(args.ids, args.top)
+    frame = build_catalog(game_ids, args.output)
+    print(f"Saved {len(frame)} games of {len(game_ids)} to {args.output}")
@@ -0,0 +1,125 @@
+"""
+Process-wide timings and counters, shown on the Diagnostics page.
+
+- `timer(name, **labels)` times a block into a histogram
+- `timed(name, **labels)` does the same for a whole function
+- `increment(name, **labels)` counts events
+Histograms keep an exact count and sum, and the last WINDOW samples for
+the p50 / p95 / p99 percentiles.
+"""
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 1024  # samples kept per histogram for the percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self):
+        ordered = sorted(self.samples)
+        quantiles = {
+            f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+            for q in QUANTILES
+        }
+        return dict(count=self.count, sum=self.total, max=self.max, **quantiles)
+
+
+class Metrics:
+    """Histograms and counters, each identified by a name and its labels."""
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(self.window)
+            self._histograms[key].observe(value)
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Records the duration of the block, in seconds, even when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def samples(self, name, **labels):
+        """Returns the recent samples of a histogram, oldest first."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            return list(histogram.samples) if histogram else []
+
+    def snapshot(self):
+        """Returns {"histograms": [...], "counters": [...]}, sorted by name."""
+        with self._lock:
+            histograms = [
+                dict(name=name, labels=dict(labels), **histogram.snapshot())
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_metrics = None
+_lock = threading.Lock()
+
+def get_metrics():
+    """Returns the process-wide Metrics."""
+    global _metrics
+    with _lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+def observe(name, value, **labels):
+    get_metrics().observe(name, value, **labels)
+
+def increment(name, value=1, **labels):
+    get_metrics().increment(name, value, **labels)
+
+def timer(name, **labels):
+    return get_metrics().timer(name, **labels)
+
+def timed(name, **labels):
+    """Decorator, the registry is looked up at call time."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
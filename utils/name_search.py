@@ -0,0 +1,113 @@
+"""
+Local search of games by name, over the primary and alternate names of the
+local catalog: no BGG search call.
+
+Names are normalized (accents stripped, case folded, punctuation as
+spaces), then every word start of every name becomes a key: "Les Aventuriers
+du Rail" is found from "aventu" or "rail" too. Keys are one sorted list, a
+prefix search is two bisects. Every key has a rank, computed once:
+1. the query starts the primary name, then an alternate name, then a word
+2. most rated games first
+so the best matches of a range, however long ("ca"), are a partial sort of
+its ranks.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from utils import metrics
+from utils.local_catalog import FEATURES, get_catalog
+
+SEARCH_LIMIT = 10
+MIN_QUERY_CHARS = 2
+
+MATCH_PRIMARY, MATCH_ALTERNATE, MATCH_WORD = 0, 1, 2
+
+
+def normalize(text):
+    """'Les Aventuriers du Rail : Europe' -> 'les aventuriers du rail europe'"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", stripped.casefold()))
+
+def word_starts(name):
+    """Suffixes of a normalized name starting at each word."""
+    return [name[i + 1:] for i, char in enumerate(name) if char == " "]
+
+
+class NameIndex:
+    """
+    Sorted name keys of the catalog games.
+    - keys: normalized names and word suffixes, sorted
+    - rows: catalog row of each key
+    - kinds: MATCH_* of each key
+    - ranks: position of each key by kind, then most rated game
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        entries = []
+        for row, (name, alternates) in enumerate(zip(catalog.text["name"], catalog.alternate_names)):
+            for kind, other in [(MATCH_PRIMARY, name)] + [(MATCH_ALTERNATE, alternate) for alternate in alternates]:
+                key = normalize(other or "")
+                if not key:
+                    continue
+                entries.append((key, row, kind))
+                entries += [(suffix, row, MATCH_WORD) for suffix in word_starts(key)]
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.rows = np.fromiter((row for _, row, _ in entries), np.int32, len(entries))
+        self.kinds = np.fromiter((kind for _, _, kind in entries), np.int8, len(entries))
+        self.popularity = np.nan_to_num(catalog.raw[:, FEATURES.index("usersrated")])
+        self.ranks = np.empty(len(entries), np.int32)
+        self.ranks[np.lexsort((-self.popularity[self.rows], self.kinds))] = np.arange(len(entries), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @metrics.timed("name_search_seconds")
+    def search(self, query, limit=SEARCH_LIMIT):
+        """[(game ID, primary name)] of the best matches of a name prefix."""
+        key = normalize(query)
+        if len(key) < MIN_QUERY_CHARS:
+            return []
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\U0010ffff", start)
+        rows, ranks = self.rows[start:end], self.ranks[start:end]
+
+        # A game has a few keys in a range: the best 4 x limit keys are
+        # enough unless the range is mostly the same games
+        candidates = np.arange(len(ranks))
+        if len(ranks) > 4 * limit:
+            candidates = np.argpartition(ranks, 4 * limit)[:4 * limit]
+        best = self._best_rows(rows, ranks, candidates, limit)
+        if len(best) < limit and len(candidates) < len(ranks):
+            best = self._best_rows(rows, ranks, np.arange(len(ranks)), limit)
+        return [(str(self.catalog.ids[row]), self.catalog.text["name"][row]) for row in best]
+
+    @staticmethod
+    def _best_rows(rows, ranks, candidates, limit):
+        """The limit best games of the candidate keys, each game at its best key."""
+        best = []
+        for row in rows[candidates[np.argsort(ranks[candidates])]]:
+            if row not in best:
+                best.append(row)
+                if len(best) == limit:
+                    break
+        return best
+
+_name_index = None
+_lock = threading.Lock()
+
+def get_name_index():
+    """Returns the process-wide NameIndex of the local catalog, None without a catalog."""
+    global _name_index
+    with _lock:
+        if _name_index is None:
+            catalog = get_catalog()
+            if catalog is not None:
+                with metrics.timer("name_index_build_seconds"):
+                    _name_index = NameIndex(catalog)
+        return _name_index
@@ -0,0 +1,135 @@
+"""
+Response cache for the predict_* endpoints of the backend.
+
+Results are cached parsed (the list of games), so a streamed response can
+be rendered while it is read and still be cached once complete.
+
+- Keys are the endpoint plus its canonicalized parameters
+- Each endpoint has its own TTL (PREDICT_TTLS), predict_userID the
+  shortest since the user's collection can change, unless the request
+  carries a collection_token (utils.collection_sync)
+- The total size of the cached results is bounded, LRU entries go first
+- Concurrent identical requests wait for a single backend call
+- Hit ratio and backend time saved are kept in `stats()`
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+PREDICT_TTLS = {  # seconds
+    "predict_filters": 60 * 60,
+    "predict_party": 15 * 60,
+    "predict_userID": 5 * 60,
+}
+DEFAULT_TTL = 5 * 60
+COLLECTION_TOKEN_TTL = 60 * 60  # results keyed by a collection_token do not go stale with the collection
+MAX_BYTES = 50 * 1024 * 1024
+
+
+def canonical_key(endpoint, params):
+    """Same request, same key: sorted params, normalized numbers, NaN as null."""
+    def normalize(value):
+        if hasattr(value, "item"):  # numpy scalars
+            value = value.item()
+        if isinstance(value, float):
+            return None if math.isnan(value) else round(value, 6)
+        return value
+    return endpoint + "?" + json.dumps({key: normalize(value) for key, value in params.items()},
+                                       sort_keys=True, default=str)
+
+
+class PredictCache:
+    """In-memory LRU of successful backend results, with single-flight."""
+    def __init__(self, ttls=PREDICT_TTLS, max_bytes=MAX_BYTES):
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, latency, size)
+        self._inflight = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "saved_seconds": 0.0}
+
+    def fetch(self, endpoint, params, call):
+        """
+        Returns the cached (value, None) of the request, or `call()`.
+        `call` returns a (value, error) tuple, only results without error
+        are cached. Exceptions are raised to every waiter.
+        """
+        key = canonical_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += entry[2]
+                return entry[0], None
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            result, latency = future.result()
+            with self._lock:
+                self._stats["saved_seconds"] += latency
+            return result
+
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        latency = time.perf_counter() - start
+        with self._lock:
+            del self._inflight[key]
+            value, error = result
+            if error is None:
+                self._store(key, value, time.time() + self.ttl(endpoint, params), latency)
+        future.set_result((result, latency))
+        return result
+
+    def ttl(self, endpoint, params):
+        ttl = self.ttls.get(endpoint, DEFAULT_TTL)
+        return max(ttl, COLLECTION_TOKEN_TTL) if "collection_token" in params else ttl
+
+    def _store(self, key, value, expires_at, latency):
+        size = len(json.dumps(value, default=str))
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[3]
+        self._entries[key] = (value, expires_at, latency, size)
+        self._size += size
+        while self._size > self.max_bytes and self._entries:
+            self._size -= self._entries.popitem(last=False)[1][3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+            served = self._stats["hits"] + self._stats["coalesced"]
+            return dict(self._stats, entries=len(self._entries), bytes=self._size,
+                        hit_ratio=served / lookups if lookups else 0.0)
+
+
+_predict_cache = None
+_cache_lock = threading.Lock()
+
+def get_predict_cache():
+    """Returns the process-wide PredictCache."""
+    global _predict_cache
+    with _cache_lock:
+        if _predict_cache is None:
+            _predict_cache = PredictCache()
+        return _predict_cache
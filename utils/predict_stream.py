@@ -0,0 +1,64 @@
+"""
+Incremental reading of predict_* responses.
+
+Games are yielded as soon as their bytes arrive, from either:
+- NDJSON (application/x-ndjson): one game object per line
+- a JSON array, parsed item by item as chunks come in. This is also the
+  fallback for a backend that does not stream: the array then simply
+  arrives in one go.
+"""
+import codecs
+import json
+
+STREAM_ACCEPT = "application/x-ndjson, application/json"
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+CHUNK_SIZE = 8192
+
+
+def iter_json_array(chunks):
+    """Yields the items of a JSON array from an iterable of text chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = closed = False
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("The response is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                closed = True
+                pos += 1
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # incomplete item, wait for the next chunk
+            if buffer[pos] in "-0123456789" and (end == len(buffer) or buffer[end] not in " \t\r\n,]"):
+                break  # a number ("12", "-6.") may go on in the next chunk
+            pos = end
+            yield item
+        buffer = buffer[pos:]
+        if closed:
+            break
+    if not closed:
+        raise ValueError("The JSON array was truncated")
+
+def iter_predictions(response):
+    """Yields the items of a streamed predict response, NDJSON or JSON array."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type in NDJSON_TYPES:
+        for line in response.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+        return
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+    yield from iter_json_array(decoder.decode(chunk) for chunk in response.iter_content(CHUNK_SIZE))
@@ -0,0 +1,77 @@
+"""
+Background prefetch of the details of predicted games.
+
+As soon as a prediction arrives, the BGG records of every returned game are
+loaded into the game cache by a bounded thread pool, at the scheduler's
+prefetch priority, and their images are warmed in the image cache. Opening
+"More infos" on any result is then a cache hit.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from constant.params import BGG_MAX_BATCH_SIZE
+from utils import bgg_scheduler
+from utils.bgg_games import fetch_games
+from utils.game_cache import get_game_cache
+from utils.image_cache import get_image_cache
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 2
+
+
+class GamePrefetcher:
+    """
+    Loads game records into the cache in the background.
+    - IDs already cached or already queued are skipped
+    - Progress counters are kept in `stats`
+    """
+    def __init__(self, workers=PREFETCH_WORKERS, batch_size=BGG_MAX_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.stats = {"requested": 0, "already_cached": 0, "fetched": 0, "failed": 0}
+
+    def prefetch(self, game_ids):
+        """Queues the game IDs for prefetch and returns immediately."""
+        game_ids = [str(game_id) for game_id in dict.fromkeys(game_ids) if game_id]
+        with self._lock:
+            game_ids = [game_id for game_id in game_ids if game_id not in self._pending]
+            self._pending.update(game_ids)
+            self.stats["requested"] += len(game_ids)
+        for i in range(0, len(game_ids), self.batch_size):
+            self._executor.submit(self._prefetch_batch, game_ids[i:i + self.batch_size])
+
+    def _prefetch_batch(self, game_ids):
+        try:
+            cached = get_game_cache("boardgame").get_many(game_ids, count_stats=False)
+            missing_ids = [game_id for game_id in game_ids if game_id not in cached]
+            fetched = fetch_games(missing_ids, priority=bgg_scheduler.PRIORITY_PREFETCH, count_stats=False)
+        except Exception as e:
+            logger.warning("Prefetch failed for %s: %s", game_ids, e)
+            cached, missing_ids, fetched = {}, game_ids, {}
+        get_image_cache().warm(record.get("image") for record in [*cached.values(), *fetched.values()])
+        with self._lock:
+            self._pending.difference_update(game_ids)
+            self.stats["already_cached"] += len(cached)
+            self.stats["fetched"] += len(fetched)
+            self.stats["failed"] += len(missing_ids) - len(fetched)
+
+    def progress(self):
+        """Returns the progress counters, with the number of IDs still pending."""
+        with self._lock:
+            return dict(self.stats, pending=len(self._pending))
+
+
+_prefetcher = None
+_lock = threading.Lock()
+
+def get_prefetcher():
+    """Returns the process-wide GamePrefetcher."""
+    global _prefetcher
+    with _lock:
+        if _prefetcher is None:
+            _prefetcher = GamePrefetcher()
+        return _prefetcher
@@ -0,0 +1,167 @@
+"""
+Precomputed "more like this" index: the most similar games of each catalog
+game, by their categories, mechanics and families.
+
+Built offline from the local catalog (`python -m utils.similar_games`):
+- each game is the set of its taxonomy codes, the three vocabularies
+  offset so that codes do not collide
+- MinHash signatures of the sets, then LSH banding: games sharing one
+  band of their signature are neighbor candidates (within a window of the
+  band's sorted keys, so huge buckets stay bounded)
+- candidates are ranked by their estimated Jaccard similarity, the TOP_K
+  best kept per game
+
+The index is one .npy structured array sorted by game ID, opened memory
+mapped: a lookup is a binary search that only reads the pages it touches.
+"""
+import bisect
+import logging
+import os
+import threading
+
+import numpy as np
+
+from utils import metrics
+from utils.filter_encoding import FILTER_FIELDS
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_GAMES_PATH = os.environ.get("SIMILAR_GAMES_PATH", "data/similar_games.npy")
+TOP_K = 10
+NUM_HASHES = 64
+BANDS = 32  # of NUM_HASHES // BANDS hashes each
+WINDOW = 16  # neighbors compared within a band bucket, on each side
+HASH_PRIME = (1 << 31) - 1
+CODE_OFFSET = 1 << 20  # per vocabulary, above any taxonomy code
+
+
+def index_dtype(top_k=TOP_K):
+    return np.dtype([("id", np.int64), ("neighbors", np.int64, (top_k,)), ("scores", np.float16, (top_k,))])
+
+def game_tokens(catalog):
+    """(game rows, tokens) of the catalog, sorted by row, one token per taxonomy code."""
+    rows = np.concatenate([catalog.taxonomy[field][0] for field in FILTER_FIELDS])
+    tokens = np.concatenate([catalog.taxonomy[field][1].astype(np.int64) + i * CODE_OFFSET
+                             for i, field in enumerate(FILTER_FIELDS)])
+    order = np.argsort(rows, kind="stable")
+    return rows[order], tokens[order]
+
+def minhash_signatures(rows, tokens, size, num_hashes=NUM_HASHES, seed=0):
+    """
+    (size, num_hashes) uint32 MinHash signatures, rows sorted.
+    Games without any token get the maximum value everywhere.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, HASH_PRIME, num_hashes, dtype=np.int64)
+    b = rng.integers(0, HASH_PRIME, num_hashes, dtype=np.int64)
+    signatures = np.full((size, num_hashes), np.iinfo(np.uint32).max, np.uint32)
+    if not len(tokens):
+        return signatures
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    for first in range(0, num_hashes, 16):  # bounded (16 x tokens) temporary
+        hashes = (a[first:first + 16, None] * tokens[None, :] + b[first:first + 16, None]) % HASH_PRIME
+        signatures[rows[starts], first:first + 16] = np.minimum.reduceat(hashes, starts, axis=1).T
+    return signatures
+
+def candidate_pairs(signatures, bands=BANDS, window=WINDOW):
+    """Unique pairs of games sharing at least one signature band, encoded as i * size + j, i < j."""
+    has_tokens = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint32).max)
+    width = signatures.shape[1] // bands
+    pairs = []
+    for band in range(bands):
+        keys = np.zeros(len(has_tokens), np.uint64)
+        for column in range(band * width, (band + 1) * width):
+            keys = keys * np.uint64(1_000_003) + signatures[has_tokens, column]
+        order = np.argsort(keys, kind="stable")
+        keys, games = keys[order], has_tokens[order]
+        for distance in range(1, window + 1):
+            same = keys[:-distance] == keys[distance:]
+            first, second = games[:-distance][same], games[distance:][same]
+            pairs.append(np.minimum(first, second) * len(signatures) + np.maximum(first, second))
+    return np.unique(np.concatenate(pairs)) if pairs else np.zeros(0, np.int64)
+
+def estimate_similarity(signatures, pairs, chunk=1 << 20):
+    """Estimated Jaccard similarity of each encoded pair (i * size + j)."""
+    size = len(signatures)
+    scores = np.empty(len(pairs), np.float32)
+    for start in range(0, len(pairs), chunk):
+        i, j = np.divmod(pairs[start:start + chunk], size)
+        scores[start:start + chunk] = (signatures[i] == signatures[j]).mean(axis=1)
+    return scores
+
+def top_neighbors(pairs, scores, size, top_k=TOP_K):
+    """(neighbor rows, scores) arrays of shape (size, top_k), -1 / 0 padded."""
+    i, j = np.divmod(pairs, size)
+    sources, targets, scores = np.r_[i, j], np.r_[j, i], np.r_[scores, scores]
+    # By source, then by decreasing score: one integer sort (scores are multiples of 1 / NUM_HASHES)
+    order = np.argsort(sources * (NUM_HASHES + 1) + np.rint((1 - scores) * NUM_HASHES).astype(np.int64))
+    sources, targets, scores = sources[order], targets[order], scores[order]
+    starts = np.searchsorted(sources, sources, side="left")
+    ranks = np.arange(len(sources)) - starts
+    keep = ranks < top_k
+    neighbors = np.full((size, top_k), -1, np.int64)
+    best = np.zeros((size, top_k), np.float32)
+    neighbors[sources[keep], ranks[keep]] = targets[keep]
+    best[sources[keep], ranks[keep]] = scores[keep]
+    return neighbors, best
+
+def build_similarity_index(catalog, path=SIMILAR_GAMES_PATH, top_k=TOP_K):
+    """Computes the index of a GameCatalog and saves it. Returns the structured array."""
+    rows, tokens = game_tokens(catalog)
+    signatures = minhash_signatures(rows, tokens, len(catalog))
+    pairs = candidate_pairs(signatures)
+    neighbors, scores = top_neighbors(pairs, estimate_similarity(signatures, pairs), len(catalog), top_k)
+
+    index = np.zeros(len(catalog), index_dtype(top_k))
+    index["id"] = catalog.ids
+    index["neighbors"] = np.where(neighbors >= 0, catalog.ids[np.maximum(neighbors, 0)], -1)
+    index["scores"] = scores
+    index = index[np.argsort(index["id"], kind="stable")]
+    np.save(path, index)
+    return index
+
+
+class SimilarGames:
+    """Read only view of a saved index, memory mapped."""
+    def __init__(self, path=SIMILAR_GAMES_PATH):
+        self.index = np.load(path, mmap_mode="r")
+        self.ids = self.index["id"]
+
+    def __len__(self):
+        return len(self.index)
+
+    @metrics.timed("similar_games_lookup_seconds")
+    def neighbors(self, game_id):
+        """[(game ID, similarity)] of the most similar games, empty for a game outside the index."""
+        game_id = int(game_id)
+        # bisect reads log2(n) IDs, np.searchsorted would copy the strided column
+        position = bisect.bisect_left(self.ids, game_id)
+        if position == len(self.ids) or self.ids[position] != game_id:
+            return []
+        entry = self.index[position]
+        return [(str(neighbor), float(score)) for neighbor, score in zip(entry["neighbors"], entry["scores"])
+                if neighbor >= 0]
+
+_similar_games = None
+_loaded = False
+_lock = threading.Lock()
+
+def get_similar_games():
+    """Returns the process-wide SimilarGames, None when there is no index file."""
+    global _similar_games, _loaded
+    with _lock:
+        if not _loaded:
+            _loaded = True
+            if os.path.exists(SIMILAR_GAMES_PATH):
+                try:
+                    _similar_games = SimilarGames()
+                except Exception as e:
+                    logger.warning("Could not open the similar games index %s: %s", SIMILAR_GAMES_PATH, e)
+        return _similar_games
+
+
+if __name__ == "__main__":
+    from utils.local_catalog import CATALOG_PATH, load_catalog
+
+    index = build_similarity_index(load_catalog())
+    print(f"Saved the {TOP_K} most similar games of {len(index)} games of {CATALOG_PATH} to {SIMILAR_GAMES_PATH}")
@@ -0,0 +1,124 @@
+"""
+Precompiled taxonomy index for the category, mechanic and family filters.
+
+The index is a small JSON artifact built once from categories_data/*.parquet
+(run `python -m utils.taxonomy` or `make taxonomy_index`). For each vocabulary
+it stores the deduplicated labels sorted case-insensitively, together with
+their integer code: the label's row in the parquet dictionary. Labels sharing
+a "Prefix:" (e.g. "Country:", "Components:") form contiguous ranges, kept as
+a grouping index, so narrowing the 5000+ families is a slice and a bisect.
+"""
+import bisect
+import json
+import os
+from functools import lru_cache
+
+from utils.metrics import timed, timer
+
+TAXONOMY_INDEX_PATH = "categories_data/taxonomy_index.json"
+TAXONOMY_VERSION = 1
+PARQUET_FILES = {  # vocabulary: (parquet file, column)
+    "category": ("categories_data/category_data.parquet", "boardgamecategory"),
+    "mechanic": ("categories_data/mechanic_data.parquet", "boardgamemechanic"),
+    "family": ("categories_data/family_data.parquet", "boardgamefamily"),
+}
+
+
+def group_of(label):
+    """'Country: England' -> 'Country', None for labels without a prefix."""
+    prefix, sep, _ = label.partition(":")
+    return prefix.strip() if sep else None
+
+
+class Taxonomy:
+    """
+    One vocabulary of the index.
+    - labels: sorted case-insensitively
+    - codes: parquet dictionary code of each label
+    - groups: {prefix: (start, end)} ranges of labels
+    """
+    def __init__(self, labels, codes, groups):
+        self.labels = labels
+        self.codes = codes
+        self.groups = {name: tuple(bounds) for name, bounds in groups.items()}
+        self._keys = [label.casefold() for label in labels]
+        self._code_by_label = dict(zip(labels, codes))
+        self._label_by_code = dict(zip(codes, labels))
+
+    @property
+    def group_names(self):
+        return sorted(self.groups, key=str.casefold)
+
+    def __contains__(self, label):
+        return label in self._code_by_label
+
+    def code_of(self, label):
+        return self._code_by_label[label]
+
+    def label_of(self, code):
+        return self._label_by_code[code]
+
+    def search(self, prefix="", group=None):
+        """Returns the labels starting with prefix (case-insensitive), within a group."""
+        start, end = self.groups[group] if group else (0, len(self.labels))
+        key = prefix.casefold()
+        if key:
+            start = bisect.bisect_left(self._keys, key, start, end)
+            end = bisect.bisect_left(self._keys, key + "\U0010ffff", start, end)
+        return self.labels[start:end]
+
+
+def compile_vocabulary(values):
+    """
+    Builds one vocabulary of the index from the parquet column values.
+    Returns a dict with sorted labels, their codes and the grouping index.
+    """
+    codes = {}
+    for code, value in enumerate(values):
+        if isinstance(value, str) and value and value not in codes:
+            codes[value] = code
+    labels = sorted(codes, key=str.casefold)
+
+    groups = {}
+    for position, label in enumerate(labels):
+        group = group_of(label)
+        if group is not None:
+            start, _ = groups.get(group, (position, position))
+            groups[group] = (start, position + 1)
+    return {"labels": labels, "codes": [codes[label] for label in labels], "groups": groups}
+
+def build_taxonomy_index(path=TAXONOMY_INDEX_PATH):
+    """Compiles the parquet dictionaries into the index artifact (needs pandas)."""
+    import pandas as pd
+
+    index = {"version": TAXONOMY_VERSION}
+    for name, (file_path, column) in PARQUET_FILES.items():
+        with timer("parquet_load_seconds", file=os.path.basename(file_path)):
+            values = pd.read_parquet(file_path)[column].tolist()
+        index[name] = compile_vocabulary(values)
+    with open(path, "w") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    return index
+
+@lru_cache(maxsize=None)
+@timed("taxonomy_load_seconds")
+def load_taxonomy_index(path=TAXONOMY_INDEX_PATH):
+    """
+    Loads the index once per process.
+    Returns a dict {vocabulary: Taxonomy}.
+    """
+    if not os.path.exists(path):
+        build_taxonomy_index(path)
+    with open(path) as f:
+        index = json.load(f)
+    if index.get("version") != TAXONOMY_VERSION:
+        raise ValueError(f"{path} is version {index.get('version')}, expected {TAXONOMY_VERSION}: "
+                         "rebuild it with `python -m utils.taxonomy`")
+    return {name: Taxonomy(**index[name]) for name in PARQUET_FILES}
+
+
+if __name__ == "__main__":
+    index = build_taxonomy_index()
+    for name in PARQUET_FILES:
+        print(f"{name}: {len(index[name]['labels'])} labels, {len(index[name]['groups'])} groups")
+    print(f"Saved {TAXONOMY_INDEX_PATH}")